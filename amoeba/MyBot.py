@@ -1,67 +1,41 @@
 '''
 Amoeba - pieces on the permiter attack the highest production piece they can
        - pieces on the interior wait it out
+
+The whole board is decided at once with array operations, which makes amoeba a cheap
+baseline to measure the other bots against.
 '''
 
-import logging
+import os
+
+import numpy
 
 from hlt import *
 from networking import *
+from masks import BoardMasks, grids
 
-logging.basicConfig(filename='amoeba.log')
-log = logging.getLogger()
-log.setLevel(logging.DEBUG)
+# DEBUG logging to amoeba.log, set up only when HALITE_LOG is set so that a bot nobody
+# is debugging neither imports logging nor creates the file before it can sendInit
+if os.environ.get('HALITE_LOG'):
+    import logging
+    logging.basicConfig(filename='amoeba.log')
+    log = logging.getLogger()
+    log.setLevel(logging.DEBUG)
 
 myID, gameMap = getInit()
 sendInit('amoeba')
 
-def adjacent_sites(gameMap, location):
-    for direction in CARDINALS:
-        loc = gameMap.getLocation(location, direction)
-        site = gameMap.getSite(loc)
-        assert site
-        yield (loc, gameMap.getSite(loc))
-
-def mine(site):
-    return site.owner == myID
-
-def adjacent_unowned_lowest_strength(gameMap, location):
-    'the location next to this piece with the lowest strength'
-    minimum = 300
-    result = None
-    for loc, site in adjacent_sites(gameMap, location):
-        if mine(site):
-            continue
-        if site.strength < minimum:
-            minimum = site.strength
-            result = (loc, site)
-    return result
-
-def get_direction(gameMap, first, second):
-    'given two adjacent locations returns direction from first to second'
-    for direction in CARDINALS:
-        loc = gameMap.getLocation(location, direction)
-        if loc.x == second.x and loc.y == second.y:
-            return direction
-    assert False, 'second is not adjacent to first'
+def moves_for(gameMap):
+    '''
+    (index, direction) pairs, in row-major order, moving each of our pieces onto the
+    weakest neighbor we don't own, as long as it is no stronger than the piece
+    '''
+    owner, strength, production = grids(gameMap)
+    masks = BoardMasks(owner, myID, strength)
+    moving = numpy.flatnonzero(masks.mine & (masks.weakest_unowned <= strength))
+    return zip(moving.tolist(), masks.weakest_direction.ravel()[moving].tolist())
 
 while True:
-    moves = []
     gameMap = getFrame()
-
-    for y in range(gameMap.height):
-        line = []
-        for x in range(gameMap.width):
-            location = Location(x, y)
-            site = gameMap.getSite(location)
-            if not mine(site):
-                continue
-
-            target = adjacent_unowned_lowest_strength(gameMap, location)
-            if not target or target[1].strength > site.strength:
-                continue
-
-            direction = get_direction(gameMap, location, target[0])
-            moves.append(Move(location, direction))
-
-    sendFrame(moves)
+    moves = moves_for(gameMap)
+    sendIndexedFrame(moves)
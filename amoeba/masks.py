@@ -0,0 +1,83 @@
+'''
+Classifies the whole board at once with NumPy instead of one cell at a time.
+
+Every grid here is a (height, width) array indexed [y, x], the same cells as a
+GameMap's flat planes. grids() wraps a map's planes without copying them, so views taken
+once keep seeing every frame networking writes into the map.
+'''
+
+import numpy
+
+from hlt import STILL, NORTH, EAST, SOUTH, WEST
+
+# the order neighbors() stacks them in
+NEIGHBOR_DIRECTIONS = (NORTH, EAST, SOUTH, WEST)
+
+def grids(gmap):
+    'the (owner, strength, production) planes of gmap as (height, width) uint8 arrays'
+    shape = (gmap.height, gmap.width)
+    return tuple(numpy.frombuffer(plane, dtype=numpy.uint8).reshape(shape)
+                 for plane in (gmap.owner, gmap.strength, gmap.production))
+
+def neighbors(grid):
+    '''
+    a (4, height, width) stack of what is north, east, south and west of every cell,
+    wrapping around the edges like the map does
+    '''
+    return numpy.stack((numpy.roll(grid, 1, axis=0), numpy.roll(grid, -1, axis=1),
+                        numpy.roll(grid, -1, axis=0), numpy.roll(grid, 1, axis=1)))
+
+
+class BoardMasks:
+    '''
+    Boolean (height, width) masks of the board from player's point of view:
+
+    mine, enemy, neutral -- who owns each cell
+    perimeter            -- our cells with at least one neighbor we don't own
+    interior             -- our cells surrounded by our own
+    frontier             -- cells we don't own next to at least one we do
+    enemy_contact        -- cells next to both our territory and an enemy's
+
+    and, when given the strengths, per-cell aggregates of the four neighbors:
+
+    enemy_strength       -- the summed strength of the enemy neighbors
+    weakest_unowned      -- the lowest strength of the neighbors we don't own, 256 if
+                            we own them all
+    weakest_direction    -- the direction of that neighbor, the first of them in
+                            NORTH, EAST, SOUTH, WEST order on a tie, STILL if there is
+                            none
+    '''
+
+    def __init__(self, owner, player, strength=None):
+        self.mine = owner == player
+        self.neutral = owner == 0
+        self.enemy = ~(self.mine | self.neutral)
+
+        around_mine = neighbors(self.mine)
+        around_enemy = neighbors(self.enemy)
+        next_to_mine = around_mine.any(axis=0)
+
+        self.perimeter = self.mine & ~around_mine.all(axis=0)
+        self.interior = self.mine & ~self.perimeter
+        self.frontier = ~self.mine & next_to_mine
+        self.enemy_contact = next_to_mine & around_enemy.any(axis=0)
+
+        if strength is None:
+            return
+
+        around_strength = neighbors(strength).astype(numpy.uint16)
+        self.enemy_strength = (around_strength * around_enemy).sum(axis=0)
+
+        unowned_strength = numpy.where(around_mine, 256, around_strength)
+        weakest = unowned_strength.argmin(axis=0)
+        self.weakest_unowned = numpy.take_along_axis(
+            unowned_strength, weakest[numpy.newaxis], axis=0)[0]
+        self.weakest_direction = numpy.where(
+            self.weakest_unowned == 256, STILL,
+            numpy.array(NEIGHBOR_DIRECTIONS, dtype=numpy.uint8)[weakest])
+
+    @classmethod
+    def of(cls, gmap, player):
+        'the masks for gmap, with the strength aggregates'
+        owner, strength, production = grids(gmap)
+        return cls(owner, player, strength)
@@ -0,0 +1,220 @@
+'''
+An append-only archive of many games, laid out so any frame of any game can be read
+straight out of a memory map.
+
+The file starts with MAGIC, then holds one record per game: a header (GAME_HEADER),
+the production plane, then every frame as an owner plane followed by a strength plane.
+All planes are uint8 and row-major, so each frame sits at a fixed stride from the start
+of its game. Opening an archive only reads the game headers, and a frame comes back as
+memoryviews into the map, without copying.
+
+A game is written tagged PART and only retagged GAME, with its frame count, once all of
+it is on disk. If the writer dies part way through a game, readers stop before that
+game and the next ArchiveWriter cuts it off, so the games before it are kept.
+
+    python3 archive.py games.hla add game-1.gz 1480800096-2248200476.hlt
+    python3 archive.py games.hla
+'''
+
+import argparse
+import mmap
+import os
+import random
+import struct
+
+MAGIC = b'HLTARCH1'
+
+# 'GAME' ('PART' while it's being written), width, height, number of players, the
+# player a recording was made for (0 for a whole replay), and the number of frames
+GAME_HEADER = struct.Struct('<4sHHBBxxI')
+
+
+def read_games(buffer):
+    '''
+    the Games in an archive's contents, and the offset where the last of them ends. A
+    final game which was never finished, or runs past the end, is left out.
+    '''
+    games = []
+    offset = len(MAGIC)
+    while offset + GAME_HEADER.size <= len(buffer):
+        tag, width, height, players, player, frames = GAME_HEADER.unpack_from(buffer, offset)
+        if tag == b'PART':
+            break
+        if tag != b'GAME':
+            raise ValueError('no game at offset {}'.format(offset))
+        game = Game(offset, width, height, players, player, frames)
+        end = game.first + frames * 2 * game.size
+        if end > len(buffer):
+            break
+        games.append(game)
+        offset = end
+    return games, offset
+
+
+class ArchiveWriter:
+    'appends games to the archive at path, creating it if need be'
+
+    def __init__(self, path):
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, 'wb') as f:
+                f.write(MAGIC)
+        self._file = open(path, 'r+b')
+        if self._file.read(len(MAGIC)) != MAGIC:
+            raise ValueError('{} is not a game archive'.format(path))
+
+        # cut off a game a writer didn't live to finish
+        with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as contents:
+            end = read_games(contents)[1]
+        self._file.truncate(end)
+
+    def append(self, width, height, players, production, frames, player=0):
+        '''
+        appends a game, frames being (owner, strength) pairs of flat planes, anything
+        bytes() takes
+        '''
+        size = width * height
+        start = self._file.seek(0, os.SEEK_END)
+        self._file.write(GAME_HEADER.pack(b'PART', width, height, players, player, 0))
+
+        count = 0
+        try:
+            production = bytes(production)
+            if len(production) != size:
+                raise ValueError('production is not {}x{}'.format(width, height))
+            self._file.write(production)
+            for owner, strength in frames:
+                owner, strength = bytes(owner), bytes(strength)
+                if len(owner) != size or len(strength) != size:
+                    raise ValueError('frame {} is not {}x{}'.format(count, width, height))
+                self._file.write(owner)
+                self._file.write(strength)
+                count += 1
+        except BaseException:
+            # leave the archive as it was rather than with half a game in it
+            self._file.truncate(start)
+            raise
+
+        # the frame count is only known now, the header is written last
+        self._file.seek(start)
+        self._file.write(GAME_HEADER.pack(b'GAME', width, height, players, player, count))
+        self._file.flush()
+
+    def append_recording(self, recording):
+        'appends a replay.Recording, what one player read during a game'
+        players = max(max(owner) for owner, strength in recording.frames)
+        self.append(recording.width, recording.height, max(players, recording.player),
+                    recording.production, recording.frames, recording.player)
+
+    def append_hlt(self, game):
+        'appends an hltfile.HltFile'
+        self.append(game.width, game.height, game.num_players, game.production,
+                    (game.frame(index) for index in range(len(game))))
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Game:
+    'where one game sits in an archive'
+
+    def __init__(self, offset, width, height, players, player, frames):
+        self.width, self.height = width, height
+        self.players, self.player = players, player
+        self.frames = frames
+        self.size = width * height
+        self.production = offset + GAME_HEADER.size
+        self.first = self.production + self.size
+
+
+class Archive:
+    'a game archive opened for reading'
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError('{} is not a game archive'.format(path))
+
+        self.games = read_games(self._map)[0]
+
+    def __len__(self):
+        return len(self.games)
+
+    def production(self, game):
+        game = self.games[game]
+        return self._view[game.production:game.first]
+
+    def frame(self, game, index):
+        '(owner, strength) of a frame, as memoryviews into the archive'
+        game = self.games[game]
+        if not 0 <= index < game.frames:
+            raise IndexError('game has {} frames'.format(game.frames))
+        start = game.first + index * 2 * game.size
+        middle = start + game.size
+        return self._view[start:middle], self._view[middle:middle + game.size]
+
+    def game_map(self, game, index, GameMap):
+        '''
+        a frame as a GameMap of the class from whichever bot's hlt is to read it, its
+        planes read-only views into the archive
+        '''
+        owner, strength = self.frame(game, index)
+        info = self.games[game]
+        return GameMap(info.width, info.height, info.players, owner=owner,
+                       strength=strength, production=self.production(game))
+
+    def sample(self, count, seed=None):
+        '(game, frame) pairs picked at random, every frame in the archive equally likely'
+        rand = random.Random(seed)
+        games = range(len(self.games))
+        weights = [game.frames for game in self.games]
+        picks = rand.choices(games, weights, k=count)
+        return [(game, rand.randrange(self.games[game].frames)) for game in picks]
+
+    def close(self):
+        # frames handed out are views into the map, which can't be unmapped while any of
+        # them is alive. Letting go of it unmaps it as soon as the last one is gone.
+        self._view = self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('archive')
+    parser.add_argument('command', nargs='?', choices=['add'])
+    parser.add_argument('games', nargs='*',
+                        help='.hlt replays, or recordings made with HALITE_RECORD set')
+    args = parser.parse_args()
+
+    if args.command == 'add':
+        with ArchiveWriter(args.archive) as writer:
+            for path in args.games:
+                if path.endswith('.hlt'):
+                    from hltfile import HltFile
+                    with HltFile(path) as game:
+                        writer.append_hlt(game)
+                else:
+                    from replay import Recording
+                    writer.append_recording(Recording(path))
+
+    with Archive(args.archive) as archive:
+        frames = sum(game.frames for game in archive.games)
+        print('{} games, {} frames, {:.1f} MiB'.format(
+            len(archive), frames, os.path.getsize(args.archive) / (1 << 20)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+'''
+Many games of the same size played in lockstep, for sweeps where stepping games one at
+a time would be the bottleneck.
+
+A Batch stacks its games into (games, height, width) owner, strength and production
+grids and plays a turn of every game with one call to halite.step, the same rules a
+single game is played with. GameMapPolicy lets a policy written against hlt.GameMap,
+like the bots' moves_for, drive a batch.
+'''
+
+from array import array
+
+import numpy
+
+import halite
+from host import moves_to_pairs
+
+
+class Batch:
+    'count games between the same number of players on maps of the same size'
+
+    def __init__(self, owner, strength, production, players):
+        self.owner, self.strength, self.production = owner, strength, production
+        self.count, self.height, self.width = owner.shape
+        self.players = players
+        self.turn = 0
+        self.limit = halite.turn_limit(self.width, self.height)
+        self.lastAlive = numpy.zeros((self.count, players), dtype=numpy.int32)
+
+    @classmethod
+    def generate(cls, count, width, height, players, seed):
+        'count new games, on the maps halite.Game would generate for seed, seed + 1, ...'
+        maps = [halite.generate_map(width, height, players, seed + game) for game in range(count)]
+        return cls(*(numpy.stack(planes) for planes in zip(*maps)), players)
+
+    def territory(self):
+        'a (games, players) array of how many cells each player owns'
+        columns = self.players + 1
+        owners = self.owner.reshape(self.count, -1) + \
+                 numpy.arange(self.count)[:, numpy.newaxis] * columns
+        counts = numpy.bincount(owners.ravel(), minlength=self.count * columns)
+        return counts.reshape(self.count, columns)[:, 1:]
+
+    def alive(self):
+        'a (games, players) array of who still owns a cell'
+        return self.territory() > 0
+
+    def over(self):
+        'which games have run out of turns or players'
+        living = self.alive().sum(axis=1)
+        return (living < min(2, self.players)) | (self.turn >= self.limit)
+
+    def step(self, directions):
+        '''
+        plays one turn of every game that isn't over, directions holding the move of
+        every owned cell in each of them
+        '''
+        over = self.over()[:, numpy.newaxis, numpy.newaxis]
+        owner, strength = halite.step(self.owner, self.strength, self.production,
+                                      directions, self.players)
+        self.owner = numpy.where(over, self.owner, owner)
+        self.strength = numpy.where(over, self.strength, strength)
+        self.turn += 1
+        self.lastAlive[self.alive() & ~over[:, :, 0]] = self.turn
+
+    def game(self, index):
+        '(owner, strength, production) of one game'
+        return self.owner[index], self.strength[index], self.production[index]
+
+
+class GameMapPolicy:
+    '''
+    Plays a player in every game of a batch with moves_for, a function that takes a
+    GameMap and returns Moves or (index, direction) pairs. GameMap is the class from the
+    hlt module moves_for was written against. Each game keeps its own map, updated in
+    place every turn like networking does, so anything moves_for caches between frames
+    keeps working.
+    '''
+
+    def __init__(self, GameMap, moves_for, player):
+        self.GameMap = GameMap
+        self.moves_for = moves_for
+        self.player = player
+        self.maps = {}
+
+    def write(self, batch, directions):
+        'writes the player\'s moves for every game of batch that isn\'t over into directions'
+        width = batch.width
+        for game in numpy.flatnonzero(~batch.over() & batch.alive()[:, self.player - 1]):
+            owner, strength, production = batch.game(game)
+            gmap = self.maps.get(game)
+            if gmap is None:
+                gmap = self.maps[game] = self.GameMap(
+                    width, batch.height, batch.players,
+                    production=array('B', production.tobytes()))
+            gmap.update(array('B', owner.tobytes()), array('B', strength.tobytes()))
+
+            moves = directions[game].reshape(-1)
+            mine = owner.reshape(-1) == self.player
+            for index, direction in moves_to_pairs(self.moves_for(gmap), width):
+                if mine[index]:
+                    moves[index] = direction
+
+
+def play(batch, policies):
+    'plays batch to the end, policies[0] playing player 1 and so on, and returns it'
+    while not batch.over().all():
+        directions = numpy.zeros(batch.owner.shape, dtype=numpy.uint8)
+        for policy in policies:
+            policy.write(batch, directions)
+        batch.step(directions)
+    return batch
@@ -0,0 +1,82 @@
+'''
+Times amoeba's vectorized policy, hosted with host.HostedBot, against the old
+cell-by-cell loop, for a range of map sizes, and checks that both make exactly the same
+moves in the same order.
+
+    python3 bench/amoeba.py [--sizes 20,30,40,50,100] [--repeat 20]
+'''
+
+import argparse
+import os
+import sys
+import timeit
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, '..', 'amoeba'))
+sys.path.insert(0, os.path.join(here, '..'))
+sys.path.insert(0, here)
+
+from decode import prepare, random_frame
+import networking
+from hlt import CARDINALS, Location
+from host import HostedBot
+
+PLAYER = 1
+
+
+def legacy_moves(gameMap, myID):
+    'the loop amoeba used to run, as (index, direction) pairs'
+    moves = []
+    for y in range(gameMap.height):
+        for x in range(gameMap.width):
+            location = Location(x, y)
+            site = gameMap.getSite(location)
+            if site.owner != myID:
+                continue
+
+            minimum = 300
+            target = None
+            for direction in CARDINALS:
+                loc = gameMap.getLocation(location, direction)
+                neighbor = gameMap.getSite(loc)
+                if neighbor.owner != myID and neighbor.strength < minimum:
+                    minimum = neighbor.strength
+                    target = (loc, neighbor)
+            if not target or target[1].strength > site.strength:
+                continue
+
+            moves.append((y * gameMap.width + x, gameMap.direction(location, target[0])))
+    return moves
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='20,30,40,50,100')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print('{:>9} {:>6} {:>12} {:>14} {:>8}'.format(
+        'size', 'moves', 'legacy ms', 'vectorized ms', 'speedup'))
+
+    for size in (int(s) for s in args.sizes.split(',')):
+        productions, frame = random_frame(size, size, seed=size)
+        prepare(size, size, productions)
+        gmap = networking.deserializeMap(frame)
+        bot = HostedBot(os.path.join(here, '..', 'amoeba'), PLAYER, size, size,
+                        gmap.production, gmap.owner, gmap.strength)
+
+        moves = legacy_moves(gmap, PLAYER)
+        assert list(bot.moves_for(gmap)) == moves, 'policies disagree'
+
+        legacy = min(timeit.repeat(lambda: legacy_moves(gmap, PLAYER),
+                                   number=1, repeat=args.repeat))
+        vectorized = min(timeit.repeat(lambda: list(bot.moves_for(gmap)),
+                                       number=1, repeat=args.repeat))
+
+        print('{:>9} {:>6} {:>12.3f} {:>14.3f} {:>7.1f}x'.format(
+            '{}x{}'.format(size, size), len(moves),
+            legacy * 1000, vectorized * 1000, legacy / vectorized))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+'''
+Times reading randomly sampled (game, frame) positions from an archive.Archive against
+reading the same frames out of .hlt replays with hltfile.HltFile. Every position is
+turned into a GameMap and checked to be the same both ways. The games are played out
+with random moves and written to a temporary directory.
+
+    python3 bench/archive.py [--size 30] [--games 20] [--samples 2000]
+'''
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, '..', 'amoeba'))
+sys.path.insert(0, os.path.join(here, '..'))
+
+import halite
+from archive import Archive, ArchiveWriter
+from hlt import GameMap
+from hltfile import HltFile
+
+PLAYERS = 4
+
+
+def write_games(directory, count, size):
+    'plays count games with random moves and writes their replays, returning the paths'
+    paths = []
+    for seed in range(count):
+        game = halite.Game(size, size, PLAYERS, seed)
+        rand = numpy.random.default_rng(seed)
+        while not game.over():
+            game.advance(rand.integers(0, 5, (size, size), dtype=numpy.uint8))
+        game.names = ['random'] * PLAYERS
+        paths.append(os.path.join(directory, '{}.hlt'.format(seed)))
+        with open(paths[-1], 'w') as f:
+            json.dump(game.replay(), f, separators=(',', ':'))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=30)
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--samples', type=int, default=2000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        paths = write_games(directory, args.games, args.size)
+        path = os.path.join(directory, 'games.hla')
+        with ArchiveWriter(path) as writer:
+            for replay in paths:
+                with HltFile(replay) as game:
+                    writer.append_hlt(game)
+
+        with Archive(path) as archive:
+            samples = archive.sample(args.samples, seed=0)
+
+            start = time.perf_counter()
+            replays = [HltFile(replay) for replay in paths]
+            fromReplays = [replays[game].game_map(index, GameMap) for game, index in samples]
+            replayTime = time.perf_counter() - start
+            for replay in replays:
+                replay.close()
+
+            start = time.perf_counter()
+            fromArchive = [archive.game_map(game, index, GameMap) for game, index in samples]
+            archiveTime = time.perf_counter() - start
+
+            for a, b in zip(fromReplays, fromArchive):
+                assert bytes(a.owner) == bytes(b.owner) and \
+                       bytes(a.strength) == bytes(b.strength), 'readers disagree'
+
+            print('{} games of {}x{}, {} frames, {} samples'.format(
+                len(archive), args.size, args.size,
+                sum(game.frames for game in archive.games), args.samples))
+            print('{:>8} {:>8} {:>14}'.format('', 'seconds', 'us per sample'))
+            for name, elapsed in (('HltFile', replayTime), ('Archive', archiveTime)):
+                print('{:>8} {:>8.3f} {:>14.1f}'.format(
+                    name, elapsed, elapsed / args.samples * 1e6))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+'''
+First checks batch.Batch against the cell-by-cell reference rules in bench/rules.py,
+stepping the same fixed positions stacked into batches of each map size. Then times
+stepping many random positions together against stepping them one at a time, checking
+that every game ends up exactly where playing it alone leaves it. Last it plays a whole
+batch with amoeba's policy driven through GameMapPolicy.
+
+    python3 bench/batched.py [--size 30] [--games 1,10,100,1000] [--turns 20] [--positions 3000]
+'''
+
+import argparse
+import os
+import sys
+import time
+
+import numpy
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, '..'))
+sys.path.insert(0, here)
+
+import batch
+import halite
+import rules
+from host import HostedBot
+
+PLAYERS = 4
+
+
+def random_positions(count, size, rand):
+    'count boards with every cell owned at random, so pieces meet all over them'
+    shape = (count, size, size)
+    return batch.Batch(rand.integers(0, PLAYERS + 1, shape, dtype=numpy.uint8),
+                       rand.integers(0, 256, shape, dtype=numpy.uint8),
+                       rand.integers(1, 16, shape, dtype=numpy.uint8), PLAYERS)
+
+
+def random_directions(games, rand):
+    return rand.integers(0, 5, games.owner.shape, dtype=numpy.uint8)
+
+
+def check_rules(count):
+    '''
+    steps rules.positions(count) in batches of the same size and number of players and
+    asserts each comes out as the reference has it, or unchanged if it was already over
+    '''
+    groups = {}
+    for position in rules.positions(count):
+        owner, strength, production, directions, players = position
+        groups.setdefault((len(owner), len(owner[0]), players), []).append(position)
+
+    for (height, width, players), group in groups.items():
+        stacked = [numpy.stack(planes) for planes in zip(*(rules.planes(p)[:4] for p in group))]
+        games = batch.Batch(*stacked[:3], players)
+        over = games.over()
+        games.step(stacked[3])
+        for game, position in enumerate(group):
+            owner, strength = (position[:2] if over[game] else rules.reference_step(*position))
+            assert games.owner[game].tolist() == owner and \
+                   games.strength[game].tolist() == strength, \
+                'batched step differs from the reference on a {}x{} map'.format(width, height)
+    return sum(len(group) for group in groups.values()), len(groups)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=30)
+    parser.add_argument('--games', default='1,10,100,1000')
+    parser.add_argument('--turns', type=int, default=20)
+    parser.add_argument('--positions', type=int, default=3000,
+                        help='random positions to check against the reference')
+    args = parser.parse_args()
+
+    print('{} positions in {} batches step as the reference rules have it'.format(
+        *check_rules(args.positions)))
+    print('{}x{} boards, {} players, {} turns of random moves'.format(
+        args.size, args.size, PLAYERS, args.turns))
+    print('{:>6} {:>16} {:>16} {:>8}'.format('games', 'single turns/s', 'batched turns/s', 'speedup'))
+
+    for count in (int(c) for c in args.games.split(',')):
+        rand = numpy.random.default_rng(count)
+        games = random_positions(count, args.size, rand)
+        single = [list(games.game(game)) for game in range(count)]
+
+        alone = together = 0
+        for turn in range(args.turns):
+            directions = random_directions(games, rand)
+
+            start = time.perf_counter()
+            for game, (owner, strength, production) in enumerate(single):
+                single[game][:2] = halite.step(owner, strength, production,
+                                               directions[game], PLAYERS)
+            alone += time.perf_counter() - start
+
+            start = time.perf_counter()
+            games.step(directions)
+            together += time.perf_counter() - start
+
+        for game, (owner, strength, production) in enumerate(single):
+            assert (games.owner[game] == owner).all() and \
+                   (games.strength[game] == strength).all(), 'batched game differs'
+
+        turns = count * args.turns
+        print('{:>6} {:>16.0f} {:>16.0f} {:>7.1f}x'.format(
+            count, turns / alone, turns / together, alone / together))
+
+    games = batch.Batch.generate(10, args.size, args.size, PLAYERS, seed=0)
+    owner, strength, production = games.game(0)
+    bots = [HostedBot(os.path.join(here, '..', 'amoeba'), player, args.size, args.size,
+                      production.tobytes(), owner.tobytes(), strength.tobytes())
+            for player in range(1, PLAYERS + 1)]
+    policies = [batch.GameMapPolicy(bot.hlt.GameMap, bot.moves_for, bot.player) for bot in bots]
+    start = time.perf_counter()
+    batch.play(games, policies)
+    elapsed = time.perf_counter() - start
+    print('10 games of amoeba against itself: {} turns in {:.1f} s'.format(games.turn, elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+'''
+Times EnemyCostField.update against recomputing the whole field, for frames which
+differ from the previous one in a given number of cells. Every repaired field is
+checked against a full recompute.
+
+Then does the same on a board where the player owns a large territory and every one of
+its cells grows each frame, as pieces sitting still do. Those cells are never on an
+enemy's path, so however many there are the field should still be repaired rather
+than recomputed.
+
+    python3 bench/costfield.py [--size 50] [--frames 50] [--changes 1,10,50,200,1000]
+'''
+
+import argparse
+import os
+import random
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'damacy'))
+
+from hlt import EnemyCostField, GameMap
+
+PLAYER = 1
+
+
+def random_board(size, rand):
+    'a neutral board with a square of territory for each of four players'
+    owner = array('B', bytes(size * size))
+    strength = array('B', (rand.randrange(256) for _ in range(size * size)))
+    for player in range(1, 5):
+        cx, cy = rand.randrange(size), rand.randrange(size)
+        for dy in range(-3, 4):
+            for dx in range(-3, 4):
+                owner[((cy + dy) % size) * size + (cx + dx) % size] = player
+    return owner, strength
+
+
+def perturb(owner, strength, count, rand):
+    'changes count cells: mostly strengths, sometimes who owns them'
+    owner, strength = array('B', owner), array('B', strength)
+    for index in rand.sample(range(len(owner)), count):
+        if rand.random() < 0.2:
+            owner[index] = rand.randrange(5)
+        strength[index] = rand.randrange(256)
+    return owner, strength
+
+
+def territory(size, rand):
+    'PLAYER owning the left half of a random_board, the other players scattered on the right'
+    owner, strength = random_board(size, rand)
+    for index in range(size * size):
+        if index % size < size // 2:
+            owner[index] = PLAYER
+        elif owner[index] == PLAYER:
+            owner[index] = 0
+    return owner, strength
+
+
+def grow(owner, strength, count, rand):
+    'every one of PLAYER\'s cells gains strength, and count other cells change'
+    owner, strength = perturb(owner, strength, 0, rand)
+    for index, o in enumerate(owner):
+        if o == PLAYER:
+            strength[index] = min(255, strength[index] + 1 + index % 7)
+    others = [index for index, o in enumerate(owner) if o != PLAYER]
+    for index in rand.sample(others, min(count, len(others))):
+        strength[index] = rand.randrange(256)
+    return owner, strength
+
+
+class CountingField(EnemyCostField):
+    'an EnemyCostField which counts how often it starts over'
+
+    recomputes = 0
+
+    def recompute(self, gmap):
+        self.recomputes += 1
+        super().recompute(gmap)
+
+
+def run(size, frames, count, board, change):
+    '(ms for a full recompute, ms for an update, updates which started over) per frame'
+    rand = random.Random(count)
+    gmap = GameMap(size, size)
+    gmap.update(*board(size, rand))
+    field = CountingField(PLAYER)
+    field.update(gmap)
+    field.recomputes = 0
+
+    full = incremental = 0
+    for frame in range(frames):
+        gmap.update(*change(gmap.owner, gmap.strength, count, rand))
+
+        start = time.perf_counter()
+        cost = field.update(gmap)
+        incremental += time.perf_counter() - start
+
+        reference = EnemyCostField(PLAYER)
+        start = time.perf_counter()
+        reference.recompute(gmap)
+        full += time.perf_counter() - start
+
+        assert cost == reference.cost, 'repaired field differs from a recompute'
+
+    return full / frames * 1000, incremental / frames * 1000, field.recomputes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=50)
+    parser.add_argument('--frames', type=int, default=50)
+    parser.add_argument('--changes', default='1,10,50,200,1000')
+    args = parser.parse_args()
+
+    print('{}x{} map, {} frames each'.format(args.size, args.size, args.frames))
+    for title, board, change in (('random cells change', random_board, perturb),
+                                 ('half the map is ours and grows', territory, grow)):
+        print()
+        print(title)
+        print('{:>8} {:>12} {:>12} {:>8} {:>10}'.format(
+            'changes', 'full ms', 'update ms', 'speedup', 'restarts'))
+        for count in (int(c) for c in args.changes.split(',')):
+            full, incremental, restarts = run(args.size, args.frames, count, board, change)
+            print('{:>8} {:>12.3f} {:>12.3f} {:>7.1f}x {:>10}'.format(
+                count, full, incremental, full / incremental, restarts))
+
+    # our own cells growing alone must never make the field start over
+    assert run(args.size, args.frames, 0, territory, grow)[2] == 0, \
+        'growing our own cells made the field start over'
+
+if __name__ == '__main__':
+    main()
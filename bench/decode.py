@@ -0,0 +1,125 @@
+'''
+Times networking.deserializeMap against the old pop(0) decoder, which built a Site
+per cell, for a range of map sizes, along with the peak memory each allocates. Frames
+are random but realistic: a handful of players own a few blobs each so the owner
+section has plenty of runs.
+
+    python3 bench/decode.py [--sizes 20,30,40,50,100] [--repeat 20]
+'''
+
+from array import array
+import argparse
+import os
+import random
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'amoeba'))
+
+import networking
+from hlt import Location, Site
+
+
+def legacy_deserializeMap(inputString):
+    'the pop(0) decoder, building the list of lists of Sites GameMap used to hold'
+    splitString = inputString.split(" ")
+
+    width, height = networking._width, networking._height
+    contents = [[Site(0, 0, 0) for x in range(width)] for y in range(height)]
+
+    y = 0
+    x = 0
+    counter = 0
+    owner = 0
+    while y != height:
+        counter = int(splitString.pop(0))
+        owner = int(splitString.pop(0))
+        for a in range(0, counter):
+            contents[y][x].owner = owner
+            x += 1
+            if x == width:
+                x = 0
+                y += 1
+
+    for a in range(0, height):
+        for b in range(0, width):
+            contents[a][b].strength = int(splitString.pop(0))
+            contents[a][b].production = networking._productions[a * width + b]
+
+    return contents
+
+
+def peak_kib(decoder, frame):
+    tracemalloc.start()
+    decoder(frame)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def random_frame(width, height, players=4, seed=0):
+    'returns (productions line, map line) for a random board'
+    rand = random.Random(seed)
+    owners = [0] * (width * height)
+    for player in range(1, players + 1):
+        for blob in range(3):
+            cx, cy = rand.randrange(width), rand.randrange(height)
+            radius = rand.randint(1, max(1, min(width, height) // 6))
+            for dy in range(-radius, radius + 1):
+                for dx in range(-radius, radius + 1):
+                    owners[((cy + dy) % height) * width + (cx + dx) % width] = player
+
+    runs = []
+    start = 0
+    for index in range(1, len(owners) + 1):
+        if index == len(owners) or owners[index] != owners[start]:
+            runs.append('{} {}'.format(index - start, owners[start]))
+            start = index
+
+    strengths = (str(rand.randrange(256)) for _ in owners)
+    productions = (str(rand.randint(1, 15)) for _ in owners)
+    return ' '.join(productions), ' '.join(runs) + ' ' + ' '.join(strengths)
+
+
+def prepare(width, height, productions):
+    networking._productions = array('B')
+    networking.deserializeMapSize('{} {}'.format(width, height))
+    networking.deserializeProductions(productions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='20,30,40,50,100')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print('{:>9} {:>7} {:>12} {:>12} {:>8} {:>11} {:>12}'.format(
+        'size', 'tokens', 'legacy ms', 'current ms', 'speedup', 'legacy KiB', 'current KiB'))
+
+    for size in (int(s) for s in args.sizes.split(',')):
+        productions, frame = random_frame(size, size, seed=size)
+        prepare(size, size, productions)
+
+        a = legacy_deserializeMap(frame)
+        b = networking.deserializeMap(frame)
+        for y in range(size):
+            for x in range(size):
+                sa, sb = a[y][x], b.getSite(Location(x, y))
+                assert (sa.owner, sa.strength, sa.production) == \
+                       (sb.owner, sb.strength, sb.production), 'decoders disagree'
+
+        legacy = min(timeit.repeat(lambda: legacy_deserializeMap(frame),
+                                   number=1, repeat=args.repeat))
+        current = min(timeit.repeat(lambda: networking.deserializeMap(frame),
+                                    number=1, repeat=args.repeat))
+
+        print('{:>9} {:>7} {:>12.3f} {:>12.3f} {:>7.1f}x {:>11.0f} {:>12.0f}'.format(
+            '{}x{}'.format(size, size), len(frame.split(' ')),
+            legacy * 1000, current * 1000, legacy / current,
+            peak_kib(legacy_deserializeMap, frame),
+            peak_kib(networking.deserializeMap, frame)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+'''
+Loads one frame from the middle of a long replay with json.load and with
+hltfile.HltFile, comparing the time and the peak memory each takes. The replay is
+played out with random moves on halite's rules and written to a temporary file.
+
+    python3 bench/hltfile.py [--size 50] [--frame 250]
+'''
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, '..'))
+
+import halite
+from hltfile import HltFile
+
+PLAYERS = 4
+
+
+def random_game(size):
+    'a game of size x size played to the turn limit with random moves'
+    game = halite.Game(size, size, PLAYERS, seed=size)
+    rand = numpy.random.default_rng(size)
+    while game.turn < game.limit:
+        game.advance(rand.integers(0, 5, (size, size), dtype=numpy.uint8) * (game.owner > 0))
+    game.names = ['random'] * PLAYERS
+    return game
+
+
+def measure(load):
+    'seconds and peak MiB load takes'
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = load()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / (1 << 20)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=50)
+    parser.add_argument('--frame', type=int, default=250)
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile('w', suffix='.hlt', delete=False) as f:
+        json.dump(random_game(args.size).replay(), f, separators=(',', ':'))
+    try:
+        def whole():
+            with open(f.name) as replay:
+                frame = json.load(replay)['frames'][args.frame]
+            return [cell[0] for row in frame for cell in row]
+
+        def streamed():
+            with HltFile(f.name) as replay:
+                return list(replay.frame(args.frame)[0])
+
+        owner, wholeTime, wholePeak = measure(whole)
+        streamedOwner, streamedTime, streamedPeak = measure(streamed)
+        assert owner == streamedOwner, 'readers disagree'
+
+        print('{}x{} replay, {:.1f} MiB, frame {}'.format(
+            args.size, args.size, os.path.getsize(f.name) / (1 << 20), args.frame))
+        print('{:>10} {:>8} {:>10}'.format('', 'seconds', 'peak MiB'))
+        print('{:>10} {:>8.2f} {:>10.1f}'.format('json.load', wholeTime, wholePeak))
+        print('{:>10} {:>8.2f} {:>10.1f}'.format('HltFile', streamedTime, streamedPeak))
+    finally:
+        os.unlink(f.name)
+
+
+if __name__ == '__main__':
+    main()
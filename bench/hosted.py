@@ -0,0 +1,52 @@
+'''
+Plays the same game twice, once with the bots as subprocesses under halite.play and
+once hosted in this process with host.play, checks that every frame matches and
+compares how long each took.
+
+    python3 bench/hosted.py [--size 30] [--seed 7] [--bots amoeba,damacy,katamari,lance]
+'''
+
+import argparse
+import os
+import sys
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))
+root = os.path.join(here, '..')
+sys.path.insert(0, root)
+
+import halite
+import host
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--bots', default='amoeba,damacy,katamari,lance')
+    args = parser.parse_args()
+
+    directories = [os.path.join(root, bot) for bot in args.bots.split(',')]
+    commands = ['{} {}'.format(sys.executable, os.path.join(d, 'MyBot.py')) for d in directories]
+
+    start = time.perf_counter()
+    piped = halite.play(commands, args.size, args.size, args.seed, None, None)
+    pipes = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hosted = host.play(directories, args.size, args.size, args.seed)
+    inside = time.perf_counter() - start
+
+    assert len(piped.frames) == len(hosted.frames), 'games lasted different lengths'
+    for (o1, s1), (o2, s2) in zip(piped.frames, hosted.frames):
+        assert (o1 == o2).all() and (s1 == s2).all(), 'hosted game differs'
+
+    turns = piped.turn
+    print('{}x{} map, {}, {} turns'.format(args.size, args.size, ' vs '.join(piped.names), turns))
+    print('{:>10} {:>10} {:>12}'.format('', 'total s', 'ms per turn'))
+    print('{:>10} {:>10.2f} {:>12.2f}'.format('pipes', pipes, pipes / turns * 1000))
+    print('{:>10} {:>10.2f} {:>12.2f}'.format('hosted', inside, inside / turns * 1000))
+
+
+if __name__ == '__main__':
+    main()
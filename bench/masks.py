@@ -0,0 +1,73 @@
+'''
+Times building BoardMasks for a whole frame, for a range of map sizes, and checks every
+mask and aggregate against the cell-by-cell definitions on the same board.
+
+    python3 bench/masks.py [--sizes 20,30,40,50,100] [--repeat 200]
+'''
+
+import argparse
+import os
+import sys
+import timeit
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, '..', 'amoeba'))
+sys.path.insert(0, here)
+
+from decode import prepare, random_frame
+import networking
+from hlt import CARDINALS, STILL
+from masks import BoardMasks
+
+PLAYER = 1
+
+
+def check(gmap, masks):
+    'compares masks with what the scalar code would say for every cell'
+    for index in range(gmap.width * gmap.height):
+        y, x = divmod(index, gmap.width)
+        owner = gmap.owner[index]
+        around = [gmap.neighbor(index, direction) for direction in CARDINALS]
+        mine = [gmap.owner[n] == PLAYER for n in around]
+        enemy = [gmap.owner[n] not in (0, PLAYER) for n in around]
+
+        assert masks.mine[y, x] == (owner == PLAYER)
+        assert masks.neutral[y, x] == (owner == 0)
+        assert masks.enemy[y, x] == (owner not in (0, PLAYER))
+        assert masks.perimeter[y, x] == (owner == PLAYER and not all(mine))
+        assert masks.interior[y, x] == (owner == PLAYER and all(mine))
+        assert masks.frontier[y, x] == (owner != PLAYER and any(mine))
+        assert masks.enemy_contact[y, x] == (any(mine) and any(enemy))
+        assert masks.enemy_strength[y, x] == sum(
+            gmap.strength[n] for n, e in zip(around, enemy) if e)
+
+        weakest, direction = 256, STILL
+        for n, m, d in zip(around, mine, CARDINALS):
+            if not m and gmap.strength[n] < weakest:
+                weakest, direction = gmap.strength[n], d
+        assert masks.weakest_unowned[y, x] == weakest
+        assert masks.weakest_direction[y, x] == direction
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='20,30,40,50,100')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    print('{:>9} {:>10}'.format('size', 'masks ms'))
+
+    for size in (int(s) for s in args.sizes.split(',')):
+        productions, frame = random_frame(size, size, seed=size)
+        prepare(size, size, productions)
+        gmap = networking.deserializeMap(frame)
+
+        check(gmap, BoardMasks.of(gmap, PLAYER))
+        best = min(timeit.repeat(lambda: BoardMasks.of(gmap, PLAYER),
+                                 number=1, repeat=args.repeat))
+
+        print('{:>9} {:>10.3f}'.format('{}x{}'.format(size, size), best * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+'''
+Checks halite.step against a cell-by-cell port of the Halite I environment's
+processNextFrame on a fixed set of positions, and times both. The positions are
+POSITIONS, picked by hand for the corner cases (1x1, 1xN and 2x2 maps, where several
+directions lead to the same cell, pieces capping at 255, combat between more than two
+players), and random small boards from seeded generators.
+
+bench/batched.py checks batch.Batch against the same reference and positions.
+
+    python3 bench/rules.py [--random 3000]
+'''
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, '..'))
+
+import halite
+
+# (owner, strength, production, directions, players), every plane as rows
+POSITIONS = [
+    # one cell, still and moving onto itself
+    ([[1]], [[250]], [[10]], [[0]], 1),
+    ([[1]], [[250]], [[10]], [[2]], 1),
+    # a row, moves wrap into the same cell from both sides
+    ([[1, 0, 2]], [[100, 50, 120]], [[1, 2, 3]], [[2, 0, 4]], 2),
+    ([[1, 2]], [[200, 200]], [[5, 5]], [[2, 4]], 2),
+    # a column
+    ([[1], [0], [1], [2]], [[255], [0], [255], [30]], [[3], [1], [4], [2]],
+     [[3], [0], [1], [1]], 2),
+    # 2x2, north and south (and east and west) are the same neighbor
+    ([[1, 1], [1, 1]], [[200, 200], [200, 200]], [[1, 1], [1, 1]], [[1, 3], [2, 4]], 1),
+    ([[1, 2], [3, 4]], [[90, 80], [70, 60]], [[2, 2], [2, 2]], [[2, 4], [1, 3]], 4),
+    # pieces merging past 255 are capped
+    ([[1, 1, 1]], [[200, 200, 200]], [[0, 0, 0]], [[2, 0, 4]], 1),
+    # three players around one neutral cell
+    ([[0, 1, 0], [2, 0, 3], [0, 0, 0]], [[0, 50, 0], [60, 40, 70], [0, 0, 0]],
+     [[1, 1, 1], [1, 1, 1], [1, 1, 1]], [[0, 3, 0], [2, 0, 4], [0, 0, 0]], 3),
+    # a strong neutral cell absorbs an attack, a weak one is taken
+    ([[1, 0, 0, 1]], [[30, 100, 10, 30]], [[1, 1, 1, 1]], [[2, 0, 0, 4]], 1),
+]
+
+
+def neighbor(width, height, x, y, direction):
+    dy, dx = halite.OFFSETS[direction]
+    return (x + dx) % width, (y + dy) % height
+
+
+def reference_step(owner, strength, production, directions, players):
+    '''
+    the next (owner, strength), as lists of rows, the way the Halite I environment's
+    processNextFrame works it out: one cell and one player at a time
+    '''
+    height, width = len(owner), len(owner[0])
+    owner = [list(row) for row in owner]
+    strength = [list(row) for row in strength]
+
+    # every player's pieces where they end up, merging any which meet. A piece which
+    # moves off a cell leaves a piece of 0 behind.
+    pieces = [{} for player in range(players)]
+    for player in range(players):
+        for y in range(height):
+            for x in range(width):
+                if owner[y][x] != player + 1:
+                    continue
+                direction = directions[y][x]
+                if direction == halite.STILL:
+                    strength[y][x] = min(255, strength[y][x] + production[y][x])
+                destination = neighbor(width, height, x, y, direction)
+                if destination in pieces[player]:
+                    pieces[player][destination] = min(
+                        255, pieces[player][destination] + strength[y][x])
+                else:
+                    pieces[player][destination] = strength[y][x]
+                pieces[player].setdefault((x, y), 0)
+                strength[y][x] = 0
+                owner[y][x] = 0
+
+    # every piece hurts every other player's pieces on its cell and next to it, and a
+    # neutral cell it stands on, which hurts it back
+    injuries = [{} for player in range(players)]
+    injured = [[0] * width for y in range(height)]
+    for player in range(players):
+        for (x, y), power in pieces[player].items():
+            for other in range(players):
+                if other == player:
+                    continue
+                for direction in range(5):
+                    cell = neighbor(width, height, x, y, direction)
+                    if cell in pieces[other]:
+                        injuries[other][cell] = injuries[other].get(cell, 0) + power
+            if strength[y][x] > 0:
+                injuries[player][x, y] = injuries[player].get((x, y), 0) + strength[y][x]
+                injured[y][x] += power
+
+    for player in range(players):
+        for cell in list(pieces[player]):
+            if cell in injuries[player]:
+                if injuries[player][cell] >= pieces[player][cell]:
+                    del pieces[player][cell]
+                else:
+                    pieces[player][cell] -= injuries[player][cell]
+
+    for y in range(height):
+        for x in range(width):
+            strength[y][x] = max(0, strength[y][x] - injured[y][x])
+            owner[y][x] = 0
+    for player in range(players):
+        for (x, y), power in pieces[player].items():
+            owner[y][x] = player + 1
+            strength[y][x] = power
+    return owner, strength
+
+
+def random_position(seed):
+    'a board of at most 7x7 with up to 4 players, and a random move for every piece'
+    rand = random.Random(seed)
+    width, height, players = rand.randint(1, 7), rand.randint(1, 7), rand.randint(1, 4)
+    owner = [[rand.choice([0] * 3 + list(range(1, players + 1))) for x in range(width)]
+             for y in range(height)]
+    strength = [[rand.choice([0, 0, rand.randrange(256), 255]) for x in range(width)]
+                for y in range(height)]
+    production = [[rand.randint(0, 15) for x in range(width)] for y in range(height)]
+    directions = [[rand.randint(0, 4) if o else 0 for o in row] for row in owner]
+    return owner, strength, production, directions, players
+
+
+def positions(count):
+    'POSITIONS, then count random ones'
+    return POSITIONS + [random_position(seed) for seed in range(count)]
+
+
+def planes(position):
+    'a position as the uint8 arrays halite.step takes'
+    owner, strength, production, directions, players = position
+    return tuple(numpy.array(plane, dtype=numpy.uint8)
+                 for plane in (owner, strength, production, directions)) + (players,)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--random', type=int, default=3000, help='random positions to add')
+    args = parser.parse_args()
+
+    cases = positions(args.random)
+    arrays = [planes(position) for position in cases]
+
+    start = time.perf_counter()
+    expected = [reference_step(*position) for position in cases]
+    referenceTime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    got = [halite.step(*position) for position in arrays]
+    stepTime = time.perf_counter() - start
+
+    for number, ((owner, strength), (stepOwner, stepStrength)) in enumerate(zip(expected, got)):
+        assert stepOwner.tolist() == owner and stepStrength.tolist() == strength, \
+            'halite.step differs from the reference on position {}'.format(number)
+
+    print('{} positions, all the same'.format(len(cases)))
+    print('{:>10} {:>8}'.format('', 'seconds'))
+    print('{:>10} {:>8.3f}'.format('reference', referenceTime))
+    print('{:>10} {:>8.3f}'.format('step', stepTime))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+'''
+Times how long each bot takes from being started to its sendInit, and fails if any
+takes longer than the threshold. Each bot is started several times and given the init
+lines of a real game, the median time until its name comes back is what counts. The
+imports that took longest, as python -X importtime reports them, are listed under it.
+
+    python3 bench/startup.py [--threshold 150] [--runs 5] [--size 30] [amoeba damacy ...]
+'''
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))
+root = os.path.join(here, '..')
+sys.path.insert(0, root)
+
+import halite
+
+BOTS = ('amoeba', 'damacy', 'katamari', 'lance', 'point-defense-drone', 'thermal-lance')
+
+
+def init_lines(size):
+    'what the engine sends player 1 of a game on a size x size map before its sendInit'
+    game = halite.Game(size, size, 2, seed=0)
+    productions = ' '.join(map(str, game.production.ravel().tolist())).encode()
+    return b'1\n%d %d\n%s\n%s\n' % (size, size, productions,
+                                     halite.encode_frame(game.owner, game.strength))
+
+
+def to_init(command, data, cwd):
+    '''
+    seconds from starting command to reading the line it answers data with, and what
+    the process wrote to stderr
+    '''
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=cwd, stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    process.stdin.write(data)
+    process.stdin.flush()
+    name = process.stdout.readline()
+    elapsed = time.perf_counter() - start
+    process.kill()
+    errors = process.communicate()[1]
+    if not name.endswith(b'\n'):
+        raise RuntimeError('{} exited before sendInit:\n{}'.format(
+            ' '.join(command), errors.decode(errors='replace')))
+    return elapsed, errors
+
+
+def slowest_imports(report, count):
+    '(microseconds, module) of the count imports which took longest themselves'
+    imports = []
+    for line in report.decode(errors='replace').splitlines():
+        if line.startswith('import time:') and not line.endswith('imported package'):
+            fields = line[len('import time:'):].split('|')
+            if fields[0].strip().isdigit():
+                imports.append((int(fields[0]), fields[2].strip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threshold', type=float, default=150, help='milliseconds')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--size', type=int, default=30)
+    parser.add_argument('--imports', type=int, default=3, help='slowest imports to list')
+    parser.add_argument('bots', nargs='*', default=BOTS)
+    args = parser.parse_args()
+
+    data = init_lines(args.size)
+    slow = []
+    with tempfile.TemporaryDirectory() as cwd:
+        print('{:>20} {:>10} {:>10}'.format('bot', 'median ms', 'worst ms'))
+        for bot in args.bots:
+            path = os.path.abspath(os.path.join(root, bot, 'MyBot.py'))
+            times = [to_init([sys.executable, path], data, cwd)[0] for run in range(args.runs)]
+            median = statistics.median(times) * 1000
+            print('{:>20} {:>10.1f} {:>10.1f}{}'.format(
+                bot, median, max(times) * 1000, '  SLOW' if median > args.threshold else ''))
+
+            report = to_init([sys.executable, '-X', 'importtime', path], data, cwd)[1]
+            for micros, module in slowest_imports(report, args.imports):
+                print('{:>20} {:>10.1f}   {}'.format('', micros / 1000, module.strip()))
+            if median > args.threshold:
+                slow.append(bot)
+
+    if slow:
+        sys.exit('over {:.0f} ms to sendInit: {}'.format(args.threshold, ', '.join(slow)))
+
+
+if __name__ == '__main__':
+    main()
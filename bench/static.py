@@ -0,0 +1,108 @@
+'''
+Times hlt.StaticFields.precompute, the production-derived fields getInit works out in
+the init window, on maps of several sizes. The fields are checked against
+straightforward definitions first, and a precompute whose deadline has already passed
+is checked to stop at once and leave the fields to be worked out on demand.
+
+    python3 bench/static.py [--sizes 20,30,40,50] [--runs 5]
+'''
+
+import argparse
+import os
+import sys
+import time
+from array import array
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, '..', 'damacy'))
+sys.path.insert(0, os.path.join(here, '..'))
+
+import halite
+from hlt import GameMap, StaticFields
+
+
+def game_map(size, seed):
+    game = halite.Game(size, size, 4, seed)
+    return GameMap(size, size, 4, owner=bytearray(game.owner.tobytes()),
+                   strength=bytearray(game.strength.tobytes()),
+                   production=bytearray(game.production.tobytes()))
+
+
+def check(gmap):
+    width, height = gmap.width, gmap.height
+    fields = StaticFields(gmap)
+    assert fields.precompute()
+    production = gmap.production
+
+    for index, value in enumerate(fields.value):
+        assert value == production[index] / max(gmap.strength[index], 1)
+
+    for radius in fields.radii:
+        smoothed = fields.smoothed(radius)
+        for y in range(height):
+            for x in range(width):
+                total = sum(production[((y + dy) % height) * width + (x + dx) % width]
+                            for dy in range(-radius, radius + 1)
+                            for dx in range(-radius, radius + 1))
+                assert abs(smoothed[y * width + x] - total / (2 * radius + 1) ** 2) < 1e-9
+
+    # every hot cell is in exactly one cluster, clusters don't touch each other and
+    # each is connected
+    hotspots, cluster = fields.hotspots(), fields.cluster()
+    hot = sorted(index for cells in hotspots for index in cells)
+    assert hot == sorted(set(hot)) == [i for i, c in enumerate(cluster) if c != -1]
+    totals = [sum(production[i] for i in cells) for cells in hotspots]
+    assert totals == sorted(totals, reverse=True)
+    for number, cells in enumerate(hotspots):
+        assert all(cluster[i] == number for i in cells)
+        for index in cells:
+            for neighbor in gmap.neighbors[index * 5 + 1:index * 5 + 5]:
+                assert cluster[neighbor] in (-1, number)
+        reached, stack = {cells[0]}, [cells[0]]
+        while stack:
+            index = stack.pop()
+            for neighbor in gmap.neighbors[index * 5 + 1:index * 5 + 5]:
+                if cluster[neighbor] == number and neighbor not in reached:
+                    reached.add(neighbor)
+                    stack.append(neighbor)
+        assert len(reached) == len(cells), 'cluster {} is not connected'.format(number)
+
+    # made turns into a game, the fields are still the first frame's
+    later = GameMap(width, height, 4, production=gmap.production)
+    later.update(array('B', gmap.owner), array('B', gmap.strength))
+    later.update(array('B', gmap.owner), array('B', ((s + 7) % 256 for s in gmap.strength)))
+    assert StaticFields(later).value == fields.value
+
+    # out of time before it starts, everything waits to be asked for
+    partial = StaticFields(gmap)
+    assert not partial.precompute(time.perf_counter())
+    assert partial._value is None and not partial._smoothed and partial._hotspots is None
+    assert partial.value == fields.value and partial.smoothed(2) == fields.smoothed(2)
+    assert partial.hotspots() == hotspots and partial.cluster() == cluster
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='20,30,40,50')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    check(game_map(17, 0))
+    check(game_map(min(sizes), 1))
+
+    print('{:>6} {:>8} {:>11}'.format('size', 'ms', 'hotspots'))
+    for size in sizes:
+        gmap = game_map(size, size)
+        times = []
+        for run in range(args.runs):
+            fields = StaticFields(gmap)
+            start = time.perf_counter()
+            fields.precompute()
+            times.append(time.perf_counter() - start)
+        print('{:>6} {:>8.1f} {:>11}'.format(
+            '{}x{}'.format(size, size), min(times) * 1000, len(fields.hotspots())))
+
+
+if __name__ == '__main__':
+    main()
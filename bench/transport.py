@@ -0,0 +1,119 @@
+'''
+Measures what the bot protocol costs per turn over a real pipe, with the old text-mode
+transport (sys.stdin.readline, str tokens, string concatenation for the moves) and the
+current one (large binary reads, bytes tokens, one buffered write for the moves).
+
+A child process plays the bot: it reads a frame, decodes it and answers with a fixed
+set of moves. The parent times each round trip. Both children decode with the current
+networking.deserializeFrame (the legacy one hands it str lines), so only reading and
+writing differ between them, not decoding.
+
+    python3 bench/transport.py [--size 50] [--turns 300] [--moves 500]
+'''
+
+import argparse
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, '..', 'amoeba'))
+sys.path.insert(0, here)
+
+from decode import random_frame
+
+
+def legacy_child(moves):
+    import networking
+
+    networking.deserializeMapSize(sys.stdin.readline().rstrip('\n'))
+    networking.deserializeProductions(sys.stdin.readline().rstrip('\n'))
+    while True:
+        line = sys.stdin.readline()
+        if not line:
+            return
+        networking.deserializeFrame(line.rstrip('\n'))
+
+        returnString = ""
+        for move in moves:
+            returnString += str(move.loc.x) + " " + str(move.loc.y) + " " + str(move.direction) + " "
+        sys.stdout.write(returnString + '\n')
+        sys.stdout.flush()
+
+
+def current_child(moves):
+    import networking
+
+    networking.deserializeMapSize(networking.getString())
+    networking.deserializeProductions(networking.getLine())
+    while True:
+        line = networking.getLine()
+        if not line:
+            return
+        networking.deserializeFrame(line)
+        networking.sendFrame(moves)
+
+
+def child(transport, size, count):
+    from hlt import Location, Move
+
+    rand = random.Random(count)
+    moves = [Move(Location(rand.randrange(size), rand.randrange(size)), rand.randint(1, 4))
+             for _ in range(count)]
+    {'legacy': legacy_child, 'current': current_child}[transport](moves)
+
+
+def run(transport, size, turns, count, warmup=20):
+    productions, frame = random_frame(size, size, seed=size)
+    bot = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--child', transport,
+         '--size', str(size), '--moves', str(count)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    bot.stdin.write('{} {}\n{}\n'.format(size, size, productions).encode())
+    frame = (frame + '\n').encode()
+
+    timings = []
+    for turn in range(warmup + turns):
+        start = time.perf_counter()
+        bot.stdin.write(frame)
+        bot.stdin.flush()
+        bot.stdout.readline()
+        timings.append(time.perf_counter() - start)
+
+    bot.stdin.close()
+    bot.wait()
+    return timings[warmup:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=50)
+    parser.add_argument('--turns', type=int, default=300)
+    parser.add_argument('--moves', type=int, default=500)
+    parser.add_argument('--child', choices=['legacy', 'current'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.size, args.moves)
+        return
+
+    print('{}x{} map, {} moves per turn, {} turns'.format(
+        args.size, args.size, args.moves, args.turns))
+    print('{:>9} {:>12} {:>12}'.format('transport', 'median ms', 'mean ms'))
+
+    medians = {}
+    for transport in ('legacy', 'current'):
+        timings = run(transport, args.size, args.turns, args.moves)
+        medians[transport] = statistics.median(timings)
+        print('{:>9} {:>12.3f} {:>12.3f}'.format(
+            transport, medians[transport] * 1000, statistics.mean(timings) * 1000))
+
+    print('saving {:.3f} ms per turn'.format((medians['legacy'] - medians['current']) * 1000))
+
+
+if __name__ == '__main__':
+    main()
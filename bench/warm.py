@@ -0,0 +1,57 @@
+'''
+Times a series of games with the bots started afresh for each against the same games
+played by warm bot servers (botserver.py), checking every frame and move comes out the
+same both ways. Small maps keep the games short, so startup is most of what they cost.
+
+    python3 bench/warm.py [--size 10] [--games 10] [damacy amoeba]
+'''
+
+import argparse
+import os
+import sys
+import time
+
+import numpy
+
+here = os.path.dirname(os.path.abspath(__file__))
+root = os.path.join(here, '..')
+sys.path.insert(0, root)
+
+import halite
+
+
+def series(commands, size, games, warm):
+    'the games played on seeds 0 up to games, and the seconds they took'
+    start = time.perf_counter()
+    played = list(halite.play_series(commands, size, size, range(games), warm=warm))
+    return played, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=10)
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('bots', nargs='*', default=['damacy', 'amoeba'])
+    args = parser.parse_args()
+
+    directories = [os.path.abspath(os.path.join(root, bot)) for bot in args.bots]
+    cold = ['{} {}'.format(sys.executable, os.path.join(d, 'MyBot.py')) for d in directories]
+    warm = ['{} {} {}'.format(sys.executable, os.path.join(root, 'botserver.py'), d)
+            for d in directories]
+
+    coldGames, coldTime = series(cold, args.size, args.games, False)
+    warmGames, warmTime = series(warm, args.size, args.games, True)
+    for a, b in zip(coldGames, warmGames):
+        assert len(a.frames) == len(b.frames) and all(
+            numpy.array_equal(x, y) for x, y in zip(a.frames + a.moves, b.frames + b.moves)), \
+            'game on seed {} came out differently'.format(a.seed)
+
+    print('{} games of {}x{} between {}'.format(
+        args.games, args.size, args.size, ' and '.join(args.bots)))
+    print('{:>6} {:>8} {:>14}'.format('', 'seconds', 'ms per game'))
+    for name, elapsed in (('cold', coldTime), ('warm', warmTime)):
+        print('{:>6} {:>8.2f} {:>14.1f}'.format(name, elapsed, elapsed / args.games * 1000))
+
+
+if __name__ == '__main__':
+    main()
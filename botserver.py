@@ -0,0 +1,45 @@
+'''
+Keeps a bot resident and plays games back to back, so only the first game pays for
+starting the interpreter and importing everything.
+
+    python3 halite.py --warm --games 100 "python3 botserver.py damacy" "python3 botserver.py amoeba"
+
+Before every game the engine sends networking.GAME_START. The server then resets
+networking and runs the bot's MyBot.py afresh, which reads the usual init lines and
+frames. When the engine sends networking.GAME_END instead of a frame, getFrame raises
+GameOver and the server waits for the next game. It exits when its input ends.
+
+To record the games with HALITE_RECORD put {game} in the path, as in
+HALITE_RECORD='damacy-{game}-{player}.gz', or each game overwrites the one before.
+'''
+
+import os
+import sys
+
+
+def serve(directory):
+    directory = os.path.abspath(directory)
+    sys.path.insert(0, directory)
+    import networking
+
+    path = os.path.join(directory, 'MyBot.py')
+    with open(path) as f:
+        code = compile(f.read(), path, 'exec')
+
+    while True:
+        line = networking.getLine()
+        if not line:
+            return
+        if line != networking.GAME_START:
+            raise ValueError('expected {!r} before a game, got {!r}'.format(
+                networking.GAME_START, line[:40]))
+
+        networking.reset()
+        try:
+            exec(code, {'__name__': '__main__', '__file__': path})
+        except networking.GameOver:
+            pass
+
+
+if __name__ == '__main__':
+    serve(sys.argv[1])
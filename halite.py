@@ -0,0 +1,477 @@
+'''
+A local Halite I environment, standing in for the ./halite binary.
+
+Runs bots as subprocesses over the same stdin/stdout protocol networking.py speaks,
+plays the game out under the Halite I rules and writes a replay file. Every frame goes
+out to all the bots at once, so a turn takes as long as the slowest bot rather than
+all of them together.
+
+    python3 halite.py -d "40 40" [-s seed] [-t] [-r replay.hlt] "python3 damacy/MyBot.py" ...
+
+With --games several games are played one after another. Adding --warm keeps each bot
+running between them (see botserver.py), so only the first game waits for it to start.
+
+The whole board is updated with array operations each turn, so a game costs little more
+than the time the bots take to move.
+'''
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import signal
+import time
+
+import numpy
+
+STILL = 0
+NORTH = 1
+EAST = 2
+SOUTH = 3
+WEST = 4
+
+# (dy, dx) of one step in each direction
+OFFSETS = ((0, 0), (-1, 0), (0, 1), (1, 0), (0, -1))
+
+INIT_TIMEOUT = 15
+TURN_TIMEOUT = 1
+
+# the lines around each game a warm bot (botserver.py) plays, as in networking.py
+GAME_START = b'#game'
+GAME_END = b'#end'
+
+
+def turn_limit(width, height):
+    return int(math.sqrt(width * height) * 10)
+
+_destinations = {}
+
+def destinations(height, width):
+    'a (5, height * width) table of the cell one step in each direction from every cell'
+    table = _destinations.get((height, width))
+    if table is None:
+        y, x = numpy.divmod(numpy.arange(height * width), width)
+        table = _destinations[height, width] = numpy.stack(
+            [(y + dy) % height * width + (x + dx) % width for dy, dx in OFFSETS])
+    return table
+
+def spread(grid):
+    'each cell summed with its four neighbors'
+    return (grid + numpy.roll(grid, 1, axis=-2) + numpy.roll(grid, -1, axis=-2)
+            + numpy.roll(grid, 1, axis=-1) + numpy.roll(grid, -1, axis=-1))
+
+
+def generate_map(width, height, players, seed):
+    '''
+    (owner, strength, production) uint8 grids for a new game. The board is one random
+    tile repeated once per player, with each player starting at the same spot of their
+    tile on a single 255 strength cell, so nobody starts out ahead.
+    '''
+    rand = numpy.random.default_rng(seed)
+    rows = max(r for r in range(1, int(math.sqrt(players)) + 1) if players % r == 0)
+    columns = players // rows
+    tileHeight, tileWidth = max(1, height // rows), max(1, width // columns)
+
+    def field(smoothing):
+        'random values in [0, 1) that vary smoothly across the tile'
+        grid = rand.random((tileHeight, tileWidth))
+        for _ in range(smoothing):
+            grid = spread(grid) / 5
+        low, high = grid.min(), grid.max()
+        grid = (grid - low) / (high - low) if high > low else numpy.zeros_like(grid)
+        return numpy.tile(grid, (rows + 1, columns + 1))[:height, :width]
+
+    production = (1 + field(3) ** 2 * 14).round().astype(numpy.uint8)
+    strength = (field(3) * 255).round().astype(numpy.uint8)
+    owner = numpy.zeros((height, width), dtype=numpy.uint8)
+
+    y, x = rand.integers(tileHeight), rand.integers(tileWidth)
+    for player in range(players):
+        row, column = divmod(player, columns)
+        start = ((row * tileHeight + y) % height, (column * tileWidth + x) % width)
+        owner[start] = player + 1
+        strength[start] = 255
+
+    return owner, strength, production
+
+
+def step(owner, strength, production, directions, players):
+    '''
+    Plays one turn and returns the new (owner, strength) grids.
+
+    directions holds the move of every owned cell, STILL for the ones not moving. Pieces
+    that stay gain their production, pieces moving onto the same cell merge, both capped
+    at 255. Every piece then takes damage from each enemy piece on or next to its cell,
+    and from the neutral strength under it. A piece dies if the damage is at least its
+    strength, and the survivors take the cells they ended up on.
+
+    The grids can also be stacked (games, height, width), which plays a turn of every
+    game at once.
+    '''
+    shape = owner.shape
+    size = shape[-2] * shape[-1]
+    cells = owner.size
+    table = destinations(*shape[-2:])
+    strength = strength.astype(numpy.int32).ravel()
+    owner, directions = owner.ravel(), directions.ravel()
+
+    # Every player gets a plane of the board, so a piece is counted into place at
+    # player * cells + cell. Moving pieces landing on the same cell merge, and a cell a
+    # piece moves off still holds one, of strength 0.
+    moving = numpy.flatnonzero(owner)
+    board, cell = numpy.divmod(moving, size)
+    plane = (owner[moving].astype(numpy.intp) - 1) * cells
+    landing = plane + board * size + table[directions[moving], cell]
+
+    still = directions[moving] == STILL
+    grown = strength[moving] + still * production.ravel()[moving]
+    planes = (players,) + shape
+    pieces = numpy.bincount(landing, weights=numpy.minimum(grown, 255),
+                            minlength=players * cells)
+    pieces = numpy.minimum(pieces, 255).astype(numpy.int16).reshape(planes)
+    present = numpy.zeros(players * cells, dtype=numpy.uint8)
+    present[landing] = 1
+    present[plane + moving] = 1
+    present = present.reshape(planes)
+
+    # What every cell's neighborhood holds, each player's own and all players together.
+    # A neighborhood is five cells, so its strength fits in 16 bits for up to 25 players.
+    own = spread(pieces)
+    ownCount = spread(present)
+    around = own.sum(axis=0, dtype=numpy.int16)
+    aroundCount = ownCount.sum(axis=0, dtype=numpy.uint8)
+    total = pieces.sum(axis=0, dtype=numpy.int16)
+
+    # A piece takes damage from every enemy piece around it and any neutral strength
+    # under it. What it has left after that, worked out in place as the planes are big.
+    neutral = numpy.where(owner == 0, strength, 0).astype(numpy.int16).reshape(shape)
+    left = own
+    left -= around
+    left -= neutral
+    left += pieces
+    injured = ownCount < aroundCount
+    injured |= neutral > 0
+    injured &= left <= 0
+    survives = present.view(bool)
+    survives &= ~injured
+
+    # no two players' pieces can both survive on one cell, each does the other at least
+    # as much damage as it has strength, so summing over players picks out the survivor
+    numbers = numpy.arange(1, players + 1, dtype=numpy.uint8).reshape(
+        (players,) + (1,) * len(shape))
+    newOwner = (survives * numbers).sum(axis=0, dtype=numpy.uint8)
+    left *= survives
+    left = left.sum(axis=0, dtype=numpy.int16)
+    newStrength = numpy.where(newOwner > 0, left, numpy.maximum(neutral - total, 0))
+    return newOwner, newStrength.astype(numpy.uint8)
+
+
+def encode_frame(owner, strength):
+    'the frame line bots read: run-length encoded owners, then every strength'
+    flat = owner.ravel()
+    starts = numpy.flatnonzero(numpy.diff(flat)) + 1
+    starts = numpy.concatenate(([0], starts))
+    lengths = numpy.diff(numpy.append(starts, flat.size))
+    runs = numpy.stack((lengths, flat[starts])).T.ravel()
+    return ' '.join(map(str, runs.tolist() + strength.ravel().tolist())).encode()
+
+def read_moves(line, owner, player, directions):
+    '''
+    Writes the moves in a bot's output line into directions, see write_moves. Raises
+    ValueError if the line isn't a list of moves.
+    '''
+    tokens = numpy.array(line.split(), dtype=numpy.int64)
+    if tokens.size % 3:
+        raise ValueError('moves must come in threes')
+    x, y, direction = tokens.reshape(-1, 3).T
+    write_moves(x, y, direction, owner, player, directions)
+
+def write_moves(x, y, direction, owner, player, directions):
+    '''
+    Writes player's moves, given as arrays of x, y and direction, into directions. Moves
+    for cells the player doesn't own, off the map or in no direction are ignored, and
+    only the first move given for a cell counts.
+    '''
+    x, y, direction = x[::-1], y[::-1], direction[::-1]
+    height, width = owner.shape
+    valid = (0 <= x) & (x < width) & (0 <= y) & (y < height) & \
+            (0 <= direction) & (direction <= 4)
+    x, y, direction = x[valid], y[valid], direction[valid]
+    mine = owner[y, x] == player
+    directions[y[mine], x[mine]] = direction[mine]
+
+
+class Bot:
+    'a bot running in its own process, talked to from an asyncio event loop'
+
+    def __init__(self, process):
+        self.process = process
+
+    @classmethod
+    async def start(cls, command):
+        # in a session of its own, so the shell and whatever it started die together,
+        # and with room for a whole line of moves on the biggest maps
+        process = await asyncio.create_subprocess_shell(
+            command, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+            start_new_session=True, limit=1 << 24)
+        return cls(process)
+
+    async def exchange(self, data, timeout):
+        '''
+        sends data and returns the line the bot answers with, without its newline. Raises
+        ValueError if the bot takes more than timeout seconds or exits, OSError if it
+        can't be written to.
+        '''
+        async def answer():
+            self.process.stdin.write(data)
+            await self.process.stdin.drain()
+            return await self.process.stdout.readline()
+
+        try:
+            line = await asyncio.wait_for(answer(), timeout)
+        except asyncio.TimeoutError:
+            raise ValueError('timed out')
+        if not line.endswith(b'\n'):
+            raise ValueError('exited')
+        return line[:-1]
+
+    def running(self):
+        return self.process.returncode is None
+
+    async def end(self):
+        'tells a warm bot the game is over, killing it if it can\'t be told'
+        try:
+            self.process.stdin.write(GAME_END + b'\n')
+            await self.process.stdin.drain()
+        except OSError:
+            await self.kill()
+
+    async def kill(self):
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        await self.process.wait()
+
+
+class Game:
+    '''
+    One game between bots, from the initial frame to the last. The frames and moves it
+    plays are kept for the replay.
+    '''
+
+    def __init__(self, width, height, players, seed):
+        self.width, self.height = width, height
+        self.players = players
+        self.seed = seed
+        self.owner, self.strength, self.production = generate_map(width, height, players, seed)
+        self.turn = 0
+        self.limit = turn_limit(width, height)
+        self.alive = [True] * players
+        self.lastAlive = [0] * players
+        self.names = [''] * players
+        self.frames = [(self.owner, self.strength)]
+        self.moves = []
+        # how long each player took to answer every frame they were sent, in seconds
+        self.latencies = [[] for _ in range(players)]
+
+    def kill(self, player):
+        'takes player out of the game, their cells turn neutral but keep their strength'
+        self.alive[player - 1] = False
+        self.owner = numpy.where(self.owner == player, 0, self.owner)
+
+    def living(self):
+        return sum(self.alive)
+
+    def over(self):
+        return self.turn >= self.limit or self.living() < min(2, self.players)
+
+    def advance(self, directions):
+        'plays one turn with every living player\'s moves written into directions'
+        self.moves.append(directions)
+        self.owner, self.strength = step(self.owner, self.strength, self.production,
+                                         directions, self.players)
+        self.turn += 1
+        self.frames.append((self.owner, self.strength))
+
+        owned = numpy.bincount(self.owner.ravel(), minlength=self.players + 1)
+        for player in range(1, self.players + 1):
+            if self.alive[player - 1]:
+                if owned[player]:
+                    self.lastAlive[player - 1] = self.turn
+                else:
+                    self.alive[player - 1] = False
+
+    def ranking(self):
+        'players from first to last: by the last turn they were alive, then territory, then strength'
+        territory = [int((self.owner == p).sum()) for p in range(1, self.players + 1)]
+        total = [int(self.strength[self.owner == p].sum()) for p in range(1, self.players + 1)]
+        return sorted(range(1, self.players + 1), key=lambda p: (
+            -self.lastAlive[p - 1], -territory[p - 1], -total[p - 1], p))
+
+    def replay(self):
+        'the game as a version 11 .hlt replay'
+        return {
+            'version': 11,
+            'width': self.width,
+            'height': self.height,
+            'num_players': self.players,
+            'num_frames': len(self.frames),
+            'player_names': self.names,
+            'seed': self.seed,
+            'productions': self.production.tolist(),
+            'frames': [numpy.stack((owner, strength), axis=-1).tolist()
+                       for owner, strength in self.frames],
+            'moves': [directions.tolist() for directions in self.moves],
+        }
+
+
+def play(commands, width, height, seed, initTimeout=INIT_TIMEOUT, turnTimeout=TURN_TIMEOUT):
+    'plays a game between the bots commands start and returns the finished Game'
+    return asyncio.run(match(commands, width, height, seed, initTimeout, turnTimeout))
+
+
+def play_series(commands, width, height, seeds, initTimeout=INIT_TIMEOUT,
+                turnTimeout=TURN_TIMEOUT, warm=False):
+    '''
+    plays a game on each of seeds in turn, yielding every Game as it finishes. With warm
+    the commands start bot servers (botserver.py), which are kept running from one game
+    to the next and only started again when one had to be killed.
+    '''
+    with asyncio.Runner() as runner:
+        bots = [None] * len(commands) if warm else None
+        try:
+            for seed in seeds:
+                if warm:
+                    bots = runner.run(restart(commands, bots))
+                yield runner.run(match(commands, width, height, seed, initTimeout,
+                                       turnTimeout, bots))
+        finally:
+            if warm:
+                runner.run(stop(bots))
+
+
+async def restart(commands, bots):
+    'bots, with a new one started for each that is missing or no longer running'
+    async def ready(command, bot):
+        return bot if bot is not None and bot.running() else await Bot.start(command)
+    return await asyncio.gather(*(ready(command, bot) for command, bot in zip(commands, bots)))
+
+
+async def stop(bots):
+    await asyncio.gather(*(bot.kill() for bot in bots if bot is not None))
+
+
+async def match(commands, width, height, seed, initTimeout, turnTimeout, bots=None):
+    '''
+    plays a game, every frame going out to all the bots at once and their answers
+    gathered as they come. Each answer's latency is kept in Game.latencies. A bot which
+    takes longer than the timeout, exits or sends garbage is out of the game.
+
+    Given bots, already running bot servers, the game is framed by GAME_START and
+    GAME_END and the bots are left running for the next one, except those killed.
+    '''
+    game = Game(width, height, len(commands), seed)
+    warm = bots is not None
+    if not warm:
+        bots = await asyncio.gather(*(Bot.start(command) for command in commands))
+    opening = GAME_START + b'\n' if warm else b''
+    productions = ' '.join(map(str, game.production.ravel().tolist())).encode()
+    frame = encode_frame(game.owner, game.strength)
+
+    async def ask(player, data, timeout):
+        'the answer of player\'s bot to data, None if it has to be taken out'
+        start = time.perf_counter()
+        try:
+            line = await bots[player - 1].exchange(data, timeout)
+        except (OSError, ValueError):
+            await bots[player - 1].kill()
+            return None
+        game.latencies[player - 1].append(time.perf_counter() - start)
+        return line
+
+    finished = False
+    try:
+        names = await asyncio.gather(*(
+            ask(player, opening + b'%d\n%d %d\n%s\n%s\n' % (
+                player, width, height, productions, frame), initTimeout)
+            for player in range(1, game.players + 1)))
+        for player, name in enumerate(names, 1):
+            if name is None:
+                game.kill(player)
+            else:
+                game.names[player - 1] = name.decode(errors='replace').strip()
+
+        while not game.over():
+            frame = encode_frame(game.owner, game.strength) + b'\n'
+            living = [player for player in range(1, game.players + 1) if game.alive[player - 1]]
+            lines = await asyncio.gather(*(ask(player, frame, turnTimeout) for player in living))
+
+            directions = numpy.zeros((height, width), dtype=numpy.uint8)
+            for player, line in zip(living, lines):
+                try:
+                    if line is None:
+                        raise ValueError('no moves')
+                    read_moves(line, game.owner, player, directions)
+                except ValueError:
+                    game.kill(player)
+                    await bots[player - 1].kill()
+            game.advance(directions)
+        finished = True
+    finally:
+        for bot in bots:
+            if warm and finished and bot.running():
+                await bot.end()
+            else:
+                await bot.kill()
+
+    return game
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-d', '--dimensions', default='30 30', help='"width height"')
+    parser.add_argument('-s', '--seed', type=int, default=None)
+    parser.add_argument('-t', '--no-timeout', action='store_true',
+                        help='wait as long as bots take')
+    parser.add_argument('-r', '--replay', help='where to write the replay, - for nowhere')
+    parser.add_argument('-g', '--games', type=int, default=1,
+                        help='play this many games, on the seeds from --seed up')
+    parser.add_argument('-w', '--warm', action='store_true',
+                        help='the bots are botserver.py, kept running from game to game')
+    parser.add_argument('bots', nargs='+', help='command to start each bot')
+    args = parser.parse_args()
+    if args.games > 1 and args.replay not in (None, '-'):
+        parser.error('one replay file can\'t hold {} games, leave out -r'.format(args.games))
+
+    width, height = map(int, args.dimensions.split())
+    seed = args.seed if args.seed is not None else random.randrange(1 << 32)
+    timeouts = (None, None) if args.no_timeout else (INIT_TIMEOUT, TURN_TIMEOUT)
+    seeds = [(seed + game) % (1 << 32) for game in range(args.games)]
+    latencies = [[] for bot in args.bots]
+
+    for game in play_series(args.bots, width, height, seeds, *timeouts, warm=args.warm):
+        replay = args.replay or '{}-{}.hlt'.format(int(time.time()), game.seed)
+        if replay != '-':
+            with open(replay, 'w') as f:
+                json.dump(game.replay(), f, separators=(',', ':'))
+            print('Map seed was {}, replay written to {}'.format(game.seed, replay))
+
+        for rank, player in enumerate(game.ranking(), 1):
+            print('Player #{}, {}, came in rank #{} and was last alive on frame #{}!'.format(
+                player, game.names[player - 1], rank, game.lastAlive[player - 1]))
+        for total, times in zip(latencies, game.latencies):
+            total.append(times)
+
+    for player, games in enumerate(latencies, 1):
+        starts = [times[0] for times in games if times]
+        turns = sorted(turn for times in games for turn in times[1:])
+        if turns:
+            print('Player #{} took {:.1f} ms per frame, {:.1f} ms at worst, {:.0f} ms to start'.format(
+                player, sum(turns) / len(turns) * 1000, turns[-1] * 1000,
+                sum(starts) / len(starts) * 1000))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+'''
+Reads .hlt replays a frame at a time instead of loading the whole file.
+
+The first pass over the file only notes where each top-level field and each frame
+starts and ends. The small fields are then read in full, while a frame is only read
+from disk and decoded when it is asked for, into the flat row-major owner and strength
+planes a GameMap holds.
+
+    python3 hltfile.py 1480800096-2248200476.hlt --frame 40 --player 2 --record lost.gz
+    python3 replay.py lost.gz point-defense-drone
+
+writes what player 2 would have read from frame 40 onwards, in the format replay.py
+plays back into a bot.
+'''
+
+import argparse
+import gzip
+import json
+from array import array
+
+import numpy
+
+import halite
+
+# the fields whose values are one entry per frame, only indexed on the first pass
+FRAME_FIELDS = ('frames', 'moves')
+
+OPEN, CLOSE, QUOTE = b'[{', b']}', ord('"')
+SEPARATORS = b':,'
+
+# everything but digits becomes a space, leaving a frame's numbers to split
+_numbersOnly = bytes(c if chr(c).isdigit() else ord(' ') for c in range(256))
+
+
+class HltFile:
+    '''
+    A replay on disk. Every field other than frames and moves is loaded as an attribute
+    (width, height, num_players, player_names, ...), productions as a flat array.
+    '''
+
+    chunkSize = 1 << 18
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._spans = {}
+        self._entries = {field: [] for field in FRAME_FIELDS}
+        try:
+            self._index()
+        except BaseException:
+            self._file.close()
+            raise
+
+        for key, (start, end) in self._spans.items():
+            if key not in FRAME_FIELDS:
+                setattr(self, key, json.loads(self._read(start, end)))
+        self.production = array('B', (p for row in self.productions for p in row))
+        del self.productions
+
+    def _read(self, start, end):
+        self._file.seek(start)
+        return self._file.read(end - start)
+
+    def _index(self):
+        '''
+        Walks the file tracking bracket depth, outside of strings, a chunk at a time.
+        Notes the span of every top-level value and of every entry of the per-frame
+        fields.
+        '''
+        depth, inString, offset = 0, False, 0
+        tail = b''
+        keyStart, valueStart = None, None
+        starts = []
+
+        while True:
+            # reading a field name moves the file, come back to where the chunks left off
+            self._file.seek(offset)
+            chunk = self._file.read(self.chunkSize)
+            if not chunk:
+                break
+            data = numpy.frombuffer(chunk, dtype=numpy.uint8)
+
+            # quotes toggle whether we are in a string, unless they are escaped; there
+            # are only a few of them, in the field names and player names
+            toggles = numpy.zeros(len(chunk), dtype=numpy.int8)
+            for position in numpy.flatnonzero(data == QUOTE).tolist():
+                before = chunk[max(0, position - 64):position]
+                if position < 64:
+                    before = tail + before
+                backslashes = len(before) - len(before.rstrip(b'\\'))
+                if backslashes % 2 == 0:
+                    toggles[position] = 1
+            inStrings = (numpy.cumsum(toggles) + inString) % 2 == 1
+            inStrings |= toggles == 1
+
+            opens = numpy.isin(data, numpy.frombuffer(OPEN, numpy.uint8)) & ~inStrings
+            closes = numpy.isin(data, numpy.frombuffer(CLOSE, numpy.uint8)) & ~inStrings
+            depths = depth + numpy.cumsum(opens.astype(numpy.int32) - closes, dtype=numpy.int32)
+
+            # entries of a top-level array open to depth 3 and close back to 2
+            separators = numpy.isin(data, numpy.frombuffer(SEPARATORS, numpy.uint8)) & \
+                         ~inStrings & (depths == 1)
+            events = (opens & (depths == 3)) | (closes & (depths == 2)) | separators | \
+                     (closes & (depths == 0)) | (opens & (depths == 1))
+            for position in numpy.flatnonzero(events).tolist():
+                character = chunk[position]
+                at = offset + position
+                if character == ord(':'):
+                    key = json.loads(self._read(keyStart, at))
+                    valueStart = at + 1
+                elif character in b'{,' or (character == ord('}') and depths[position] == 0):
+                    if valueStart is not None:
+                        self._spans[key] = (valueStart, at)
+                        valueStart = None
+                    keyStart = at + 1
+                elif character in OPEN:
+                    starts.append(at)
+                elif valueStart is not None and key in FRAME_FIELDS:
+                    self._entries[key].append((starts.pop(), at + 1))
+                else:
+                    starts.pop()
+
+            depth = int(depths[-1])
+            inString = (int(toggles.sum()) + inString) % 2 == 1
+            tail = chunk[-64:]
+            offset += len(chunk)
+
+    def __len__(self):
+        return len(self._entries['frames'])
+
+    def _numbers(self, field, index):
+        start, end = self._entries[field][index]
+        return numpy.array(self._read(start, end).translate(_numbersOnly).split(),
+                           dtype=numpy.uint8)
+
+    def frame(self, index):
+        '(owner, strength) of frame index as flat arrays, like networking.deserializeFrame'
+        numbers = self._numbers('frames', index)
+        return array('B', numbers[0::2].tobytes()), array('B', numbers[1::2].tobytes())
+
+    def moves(self, index):
+        'the direction every cell moved in from frame index to the next, as a flat array'
+        return array('B', self._numbers('moves', index).tobytes())
+
+    def game_map(self, index, GameMap):
+        'frame index as a GameMap, of the class from whichever bot\'s hlt is to play it'
+        owner, strength = self.frame(index)
+        return GameMap(self.width, self.height, self.num_players,
+                       owner=owner, strength=strength, production=self.production[:])
+
+    def frame_line(self, index):
+        'frame index as the line the engine sends bots'
+        owner, strength = (numpy.frombuffer(plane, dtype=numpy.uint8)
+                           for plane in self.frame(index))
+        return halite.encode_frame(owner, strength)
+
+    def lines(self, player, start=0):
+        '''
+        what player would read if the game had begun at frame start: the init lines,
+        then every frame it moves on. Like the engine it sends the init frame again as
+        the first turn, and stops before the last frame, which nobody moves on.
+        '''
+        yield b'%d' % player
+        yield b'%d %d' % (self.width, self.height)
+        yield ' '.join(map(str, self.production)).encode()
+        yield self.frame_line(start)
+        for index in range(start, len(self) - 1):
+            yield self.frame_line(index)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('replay')
+    parser.add_argument('--frame', type=int, default=0)
+    parser.add_argument('--player', type=int, default=1)
+    parser.add_argument('--record', help='write the lines player would read from frame '
+                                         'on to this file, for replay.py')
+    args = parser.parse_args()
+
+    with HltFile(args.replay) as game:
+        print('{}x{}, {} frames, {}'.format(
+            game.width, game.height, len(game), ' vs '.join(game.player_names)))
+
+        owner, strength = game.frame(args.frame)
+        territory = numpy.bincount(owner, minlength=game.num_players + 1)[1:]
+        print('frame {}: territory {}'.format(args.frame, territory.tolist()))
+
+        if args.record:
+            with gzip.open(args.record, 'wb') as f:
+                for line in game.lines(args.player, args.frame):
+                    f.write(line + b'\n')
+
+
+if __name__ == '__main__':
+    main()
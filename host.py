@@ -0,0 +1,131 @@
+'''
+Runs a bot's strategy inside this process, handing it GameMaps directly instead of
+text over a pipe.
+
+A bot sets itself up and plays its game when MyBot.py is run, so HostedBot runs that
+file unchanged with a stand-in for networking: getInit hands over the first frame,
+sendInit records the name, and the first getFrame stops the bot before its main loop.
+What is left behind is the bot's moves_for, bound to the myID it was given and to
+whatever else it set up. Each HostedBot gets its own copies of the bot's hlt, networking
+and masks modules, so bots can be hosted side by side and nothing they keep at module
+level is shared.
+'''
+
+import importlib
+import os
+import sys
+import types
+from array import array
+
+import numpy
+
+import halite
+
+# modules every bot directory has its own copy of
+BOT_MODULES = ('hlt', 'networking', 'masks')
+
+
+class Started(Exception):
+    'raised by the first getFrame, once the bot has finished setting up'
+
+
+class HostedBot:
+    '''
+    The bot in directory, playing player on a map of width x height. production, owner
+    and strength are the flat, row-major planes of the first frame, like the lines a bot
+    reads at the start of a game.
+    '''
+
+    def __init__(self, directory, player, width, height, production, owner, strength):
+        self.directory = os.path.abspath(directory)
+        self.player = player
+        self.name = None
+
+        saved = {name: sys.modules.pop(name) for name in BOT_MODULES if name in sys.modules}
+        sys.path.insert(0, self.directory)
+        try:
+            self.hlt = importlib.import_module('hlt')
+            self.networking = importlib.import_module('networking')
+
+            self.map = self.hlt.GameMap(width, height, production=array('B', production))
+            self.map.update(array('B', owner), array('B', strength))
+            self.networking.getInit = lambda: (player, self.map)
+            self.networking.sendInit = self._sendInit
+            self.networking.getFrame = self._getFrame
+
+            path = os.path.join(self.directory, 'MyBot.py')
+            with open(path) as f:
+                code = compile(f.read(), path, 'exec')
+            self.module = types.ModuleType('MyBot')
+            self.module.__file__ = path
+            try:
+                exec(code, self.module.__dict__)
+            except Started:
+                pass
+            else:
+                raise RuntimeError('{} finished without asking for a frame'.format(path))
+        finally:
+            sys.path.remove(self.directory)
+            for name in BOT_MODULES:
+                sys.modules.pop(name, None)
+            sys.modules.update(saved)
+
+        self.moves_for = self.module.moves_for
+
+    def _sendInit(self, name):
+        self.name = name
+
+    def _getFrame(self):
+        raise Started()
+
+    def frame(self, owner, strength):
+        '''
+        moves for the next frame, given its owner and strength planes, as (index,
+        direction) pairs. The bot's map is updated in place, as it is under the engine.
+        '''
+        self.map.update(array('B', owner), array('B', strength))
+        return moves_to_pairs(self.moves_for(self.map), self.map.width)
+
+
+def moves_to_pairs(moves, width):
+    '(index, direction) pairs for Moves, or for pairs already'
+    pairs = []
+    for move in moves:
+        if hasattr(move, 'loc'):
+            pairs.append((move.loc.y * width + move.loc.x, move.direction))
+        else:
+            pairs.append(tuple(move))
+    return pairs
+
+
+def play(directories, width, height, seed):
+    '''
+    plays a game between the bots in directories, all inside this process, and returns
+    the finished halite.Game. A bot which raises is taken out of the game, as the engine
+    does with one that crashes.
+    '''
+    game = halite.Game(width, height, len(directories), seed)
+    bots = []
+    for player, directory in enumerate(directories, 1):
+        bot = HostedBot(directory, player, width, height, game.production.tobytes(),
+                        game.owner.tobytes(), game.strength.tobytes())
+        game.names[player - 1] = bot.name
+        bots.append(bot)
+
+    while not game.over():
+        owner, strength = game.owner.tobytes(), game.strength.tobytes()
+        directions = numpy.zeros((height, width), dtype=numpy.uint8)
+        for player, bot in enumerate(bots, 1):
+            if not game.alive[player - 1]:
+                continue
+            try:
+                pairs = bot.frame(owner, strength)
+            except Exception:
+                game.kill(player)
+                continue
+            index, direction = numpy.array(pairs, dtype=numpy.int64).reshape(-1, 2).T
+            y, x = numpy.divmod(index, width)
+            halite.write_moves(x, y, direction, game.owner, player, directions)
+        game.advance(directions)
+
+    return game
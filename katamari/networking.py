@@ -1,19 +1,74 @@
 from hlt import *
-import socket
-import traceback
-import struct
-from ctypes import *
+from array import array
+import os
 import sys
+import time
 
-_productions = []
+_productions = array('B')
 _width = -1
 _height = -1
+_map = None
+
+# Input is read from stdin's binary buffer in large chunks and split into lines here,
+# _inputBuffer[_inputStart:] is what has been read but not yet returned by getLine
+_readSize = 1 << 16
+_inputBuffer = b''
+_inputStart = 0
+
+# the encoded "x y " of every cell and "d " of every direction, so encoding a move is
+# two lookups. _cellTokens is filled in once the map size is known.
+_cellTokens = []
+_directionTokens = [str(d).encode() + b' ' for d in DIRECTIONS]
+
+# A warm server (botserver.py) plays games back to back in one process. The engine
+# starts each game with a GAME_START line before the usual init lines, and ends it with
+# GAME_END where the next frame would be.
+GAME_START = b'#game'
+GAME_END = b'#end'
+
+class GameOver(Exception):
+    'raised by getFrame when the engine ends the game'
+
+# The engine waits this long for sendInit. getInit spends up to a fraction of it, its
+# precompute argument, working out the map's StaticFields.
+INIT_TIMEOUT = 15
+
+# With HALITE_RECORD set to a path every line the bot reads is also written to that
+# file, gzipped, for replay.py to play back later. {player} in the path is replaced
+# with the bot's player tag, so every bot in a game can record at once. {game} is
+# replaced with how many games the process played before this one, a warm server
+# (botserver.py) records every game to the same file unless the path has it.
+_recording = None
+_games = 0
+
+def encodeMoves(moves):
+    '''
+    encodes a list of Moves as a complete move line. STILL moves are dropped, the
+    engine already assumes STILL for any piece it has no move for.
+    '''
+    cells, directions, width = _cellTokens, _directionTokens, _width
+    tokens = []
+    for move in moves:
+        if move.direction != STILL:
+            loc = move.loc
+            tokens.append(cells[loc.y * width + loc.x])
+            tokens.append(directions[move.direction])
+    tokens.append(b'\n')
+    return b''.join(tokens)
+
+def encodeIndexedMoves(moves):
+    'like encodeMoves but takes (index, direction) pairs, index being y*width + x'
+    cells, directions = _cellTokens, _directionTokens
+    tokens = []
+    for index, direction in moves:
+        if direction != STILL:
+            tokens.append(cells[index])
+            tokens.append(directions[direction])
+    tokens.append(b'\n')
+    return b''.join(tokens)
 
 def serializeMoveSet(moves):
-    returnString = ""
-    for move in moves:
-        returnString += str(move.loc.x) + " " + str(move.loc.y) + " " + str(move.direction) + " "
-    return returnString
+    return encodeMoves(moves)[:-1].decode()
 
 def deserializeMapSize(inputString):
     splitString = inputString.split(" ")
@@ -22,63 +77,130 @@ def deserializeMapSize(inputString):
     _width = int(splitString.pop(0))
     _height = int(splitString.pop(0))
 
+    _cellTokens[:] = ['{} {} '.format(x, y).encode()
+                      for y in range(_height) for x in range(_width)]
+
 def deserializeProductions(inputString):
-    splitString = inputString.split(" ")
+    splitString = inputString.split()
 
-    for a in range(0, _height):
-        row = []
-        for b in range(0, _width):
-            row.append(int(splitString.pop(0)))
-        _productions.append(row)
+    _productions.extend(map(int, splitString[:_width * _height]))
 
-def deserializeMap(inputString):
-    splitString = inputString.split(" ")
+def deserializeFrame(inputString):
+    'returns the (owner, strength) planes of a frame, given as either str or bytes'
+    splitString = inputString.split()
+
+    size = _width * _height
 
-    m = GameMap(_width, _height)
-
-    y = 0
-    x = 0
-    counter = 0
-    owner = 0
-    while y != m.height:
-        counter = int(splitString.pop(0))
-        owner = int(splitString.pop(0))
-        for a in range(0, counter):
-            m.contents[y][x].owner = owner
-            x += 1
-            if x == m.width:
-                x = 0
-                y += 1
-
-    for a in range(0, _height):
-        for b in range(0, _width):
-            m.contents[a][b].strength = int(splitString.pop(0))
-            m.contents[a][b].production = _productions[a][b]
-
-    return m
+    # Walk the tokens with an index, popping from the front of the list is O(n) per
+    # token. The owners are run-length encoded as (counter, owner) pairs.
+    owners = bytearray()
+    index = 0
+    while len(owners) < size:
+        owners += bytes((int(splitString[index + 1]),)) * int(splitString[index])
+        index += 2
+
+    return array('B', owners), array('B', map(int, splitString[index:index + size]))
+
+def deserializeMap(inputString):
+    owner, strength = deserializeFrame(inputString)
+    return GameMap(_width, _height,
+                   owner=owner, strength=strength, production=_productions[:])
 
 def sendString(toBeSent):
     toBeSent += '\n'
 
-    sys.stdout.write(toBeSent)
+    sendBytes(toBeSent.encode())
+
+def sendBytes(toBeSent):
+    'writes an already encoded line with a single write'
     sys.stdout.flush()
+    sys.stdout.buffer.write(toBeSent)
+    sys.stdout.buffer.flush()
+
+def getLine():
+    'the next line of input as bytes, without its newline. Returns b"" at EOF'
+    global _inputBuffer, _inputStart
+    while True:
+        end = _inputBuffer.find(b'\n', _inputStart)
+        if end != -1:
+            line = _inputBuffer[_inputStart:end]
+            _inputStart = end + 1
+            return line
+
+        chunk = sys.stdin.buffer.read1(_readSize)
+        if not chunk:
+            line = _inputBuffer[_inputStart:]
+            _inputBuffer, _inputStart = b'', 0
+            return line
+        _inputBuffer = _inputBuffer[_inputStart:] + chunk
+        _inputStart = 0
 
 def getString():
-    return sys.stdin.readline().rstrip('\n')
-
-def getInit():
-    playerTag = int(getString())
-    deserializeMapSize(getString())
-    deserializeProductions(getString())
-    m = deserializeMap(getString())
-
-    return (playerTag, m)
+    return getLine().decode()
+
+def _record(lines):
+    'writes lines to the recording, flushed so it survives the bot being killed'
+    _recording.write(b''.join(line + b'\n' for line in lines))
+    _recording.flush()
+
+def getInit(precompute=0.2):
+    '''
+    reads the init lines, returning (playerTag, gameMap). Before returning it works out
+    the map's StaticFields for up to precompute * INIT_TIMEOUT seconds, 0 to skip that.
+    '''
+    global _map, _recording, _games
+    lines = [getLine() for _ in range(4)]
+    start = time.perf_counter()
+    playerTag = int(lines[0])
+    deserializeMapSize(lines[1].decode())
+    deserializeProductions(lines[2])
+
+    if os.environ.get('HALITE_RECORD'):
+        import gzip
+        path = os.environ['HALITE_RECORD'].format(player=playerTag, game=_games)
+        _recording = gzip.open(path, 'wb')
+        _record(lines)
+    _games += 1
+
+    # The same map is returned for the whole game, productions never change so they
+    # are written once here and every frame only overwrites owners and strengths
+    _map = GameMap(_width, _height, production=_productions)
+    _map.update(*deserializeFrame(lines[3]))
+    if precompute > 0:
+        _map.static.precompute(start + precompute * INIT_TIMEOUT)
+
+    return (playerTag, _map)
 
 def sendInit(name):
     sendString(name)
 
 def getFrame():
-    return deserializeMap(getString())
+    line = getLine()
+    if line == GAME_END:
+        raise GameOver()
+    if _recording is not None:
+        _record((line,))
+    _map.update(*deserializeFrame(line))
+    return _map
 
 def sendFrame(moves):
-    sendString(serializeMoveSet(moves))
+    sendBytes(encodeMoves(moves))
+
+def sendIndexedFrame(moves):
+    sendBytes(encodeIndexedMoves(moves))
+
+def reset():
+    '''
+    forgets everything about the game being played, so a warm server can start another.
+    Input read ahead of the game is kept, it belongs to the next one.
+    '''
+    global _productions, _width, _height, _map, _recording, _inputBuffer, _inputStart
+    _productions = array('B')
+    _width = -1
+    _height = -1
+    _map = None
+    _cellTokens[:] = []
+    _inputBuffer, _inputStart = _inputBuffer[_inputStart:], 0
+    if _recording is not None:
+        _recording.close()
+        _recording = None
@@ -5,19 +5,21 @@ Amoeba - pieces on the permiter attack the highest production piece they can
 Lance - pieces on the interior move to the closest perimeter if it wouldn't cap
 '''
 
-import logging
 from collections import namedtuple
+import os
 import random
-import kdtree
 
 from hlt import *
 from networking import *
 
 Tup = namedtuple('Tup', ['loc', 'site'])
 
-logging.basicConfig(filename='amoeba.log')
-log = logging.getLogger()
-log.setLevel(logging.DEBUG)
+# DEBUG logging, only when HALITE_LOG is set
+if os.environ.get('HALITE_LOG'):
+    import logging
+    logging.basicConfig(filename='amoeba.log')
+    log = logging.getLogger()
+    log.setLevel(logging.DEBUG)
 
 myID, gameMap = getInit()
 sendInit('lance')
@@ -62,11 +64,7 @@ def adjacent_unowned_lowest_strength(gameMap, location):
 
 def get_direction(gameMap, first, second):
     'given two adjacent locations returns direction from first to second'
-    for direction in CARDINALS:
-        loc = gameMap.getLocation(location, direction)
-        if loc.x == second.x and loc.y == second.y:
-            return direction
-    assert False, 'second is not adjacent to first'
+    return gameMap.direction(first, second)
 
 def is_perimeter(gameMap, location):
     # if there are any adjacent nodes which are not mine, I'm perimeter
@@ -75,11 +73,8 @@ def is_perimeter(gameMap, location):
         return True
     return False
 
-while True:
+def moves_for(gameMap):
     moves = []
-    gameMap = getFrame()
-
-    perimeter_tree = kdtree.create(dimensions=2)
     perimeter_nodes = []
 
     internal_nodes = []
@@ -87,18 +82,20 @@ while True:
     # first collect all the nodes
     for y in range(gameMap.height):
         for x in range(gameMap.width):
-            location = Location(x, y)
+            location = gameMap.locations[y * gameMap.width + x]
             site = gameMap.getSite(location)
             if not mine(site):
                 continue
 
             if is_perimeter(gameMap, location):
-                perimeter_tree.add((x, y))
                 perimeter_nodes.append(location)
             else:
                 internal_nodes.append(location)
 
-    perimeter_tree.rebalance()
+    # how far every cell is from the closest perimeter piece and which way that is,
+    # this wraps around the edges of the map just like the pieces do
+    distance, towards = distance_transform(
+        gameMap, [gameMap.index(location) for location in perimeter_nodes])
 
     # now move them!
     for location in perimeter_nodes:
@@ -120,16 +117,18 @@ while True:
         if site.strength < 50:
             continue
 
-        closest_perim = perimeter_tree.search_nn((location.x, location.y))[0]
-        perim_loc = Location(closest_perim.data[0], closest_perim.data[1])
-
-        distance_to = lambda neighbor: gameMap.getDistance(perim_loc, neighbor.loc)
-        min_neighbor = min(adjacent_sites(gameMap, location), key=distance_to)
+        direction = towards[gameMap.index(location)]
+        if direction == STILL:
+            # there's no perimeter to head for, all of the map is ours
+            continue
 
-        direction = get_direction(gameMap, location, min_neighbor.loc)
-        #next_spot = gameMap.getLocation(location, direction)
         moves.append(Move(location, direction))
 
+    return moves
+
+while True:
+    gameMap = getFrame()
+    moves = moves_for(gameMap)
     sendFrame(moves)
 
 '''
@@ -64,10 +64,8 @@ A devastating loss:
 This bot does quite badly at close quarters
 '''
 
-import math
-from queue import PriorityQueue, Queue
+from queue import Queue
 from collections import namedtuple, defaultdict
-import functools
 
 from hlt import *
 from networking import *
@@ -83,9 +81,6 @@ def p_mine(site):
 def p_my_piece(piece):
     return p_mine(piece.site)
 
-def p_enemy(piece):
-    return piece.site.owner != myID and piece.site.owner != 0
-
 def adjacent_pieces(gmap, location):
     for direction in CARDINALS:
         loc = gmap.one_over(location, direction)
@@ -97,61 +92,22 @@ def my_adjacent_pieces(gmap, location):
 
 def get_direction(gmap, first, second):
     'given two adjacent locations returns direction from first to second'
-    for direction in CARDINALS:
-        loc = gmap.one_over(first, direction)
-        if loc.x == second.x and loc.y == second.y:
-            return direction
-    assert False, 'second is not adjacent to first'
-
-def piece_is_border(gmap, piece):
-    if p_my_piece(piece):
-        return False
-    return bool(my_adjacent_pieces(gmap, piece.loc))
+    return gmap.direction(first, second)
 
 def all_pieces(gmap):
-    for y in range(gmap.height):
-        for x in range(gmap.width):
-            location = Location(x, y)
-            site = gmap.getSite(location)
-            yield Piece(location, site)
+    for location in gmap.locations:
+        yield Piece(location, gmap.getSite(location))
+
+# kept between turns so each turn only repairs the costs around what changed
+enemy_costs = EnemyCostField(myID)
 
 def cost_to_enemy_map(gmap):
     '''
-    returns a dict[loc] -> cost, where cost is the cheapest path
-    (by strength) from this cell to any enemy cell.
+    returns a list indexed like gmap's planes, cost is the cheapest path
+    (by strength) from this cell to any enemy cell. Paths never go through our own
+    pieces, so enclaves are never reached and keep an infinite cost.
     '''
-    enemies = [enemy.loc for enemy in all_pieces(gmap) if p_enemy(enemy)]
-
-    # flood-fill, starting from any of the enemies, until there are no more nodes
-    horizon = PriorityQueue()
-    visited = set()
-
-    # defaultdict because lower down we stop routing once we see any of our own pieces.
-    # doing so means that any enclaves are never considered which causes issues later on.
-    cost_to_enemy = defaultdict(lambda: math.inf)
-
-    for enemy in enemies:
-        cost_to_enemy[enemy] = 0
-        visited.add(enemy)
-        horizon.put((0, enemy)) # All enemy cells are considered equally valuable
-
-    while not horizon.empty():
-        (curr_cost, enemy) = horizon.get()
-
-        for neighbor in adjacent_pieces(gmap, enemy):
-            if neighbor.loc in visited:
-                continue
-            visited.add(neighbor.loc)
-
-            # TODO: Maybe you don't want this check?
-            if p_my_piece(neighbor):
-                continue
-
-            new_cost = curr_cost + neighbor.site.strength
-            cost_to_enemy[neighbor.loc] = new_cost
-            horizon.put((new_cost, neighbor.loc))
-
-    return cost_to_enemy
+    return enemy_costs.update(gmap)
 
 def assign_to_battle(gmap, target, used_locations):
     'Takes every piece within a radius of 10 and moves them towards the target'
@@ -194,45 +150,24 @@ def assign_to_battle(gmap, target, used_locations):
     return moves, assigned
 
 
-def find_move(gmap, target, used_locations):
-    unexplored = PriorityQueue()
-    visited = set()
-
-    is_enemy = False
+def strength_needed(gmap, target):
+    'the strength it takes to capture the cell at target, counting the enemies next to it'
+    owner, strength = gmap.owner, gmap.strength
     enemy_strength = 0
-    for neighbor in adjacent_pieces(gmap, target.loc):
-        if p_enemy(neighbor):
-            enemy_strength += neighbor.site.strength
-            is_enemy = True
-
-    unexplored.put((enemy_strength + target.site.strength, target, set()))
-    visited.add(target.loc)
-
-    # TODO: I think removing visited and only using path_locations makes sense?
-    while not unexplored.empty():
-        (remaining, candidate, path_locations) = unexplored.get()
-
-        for piece in my_adjacent_pieces(gmap, candidate.loc):
-            if piece.loc in used_locations:
-                continue
-            if piece.loc in visited:
-                continue
-
-            new_path_locations = path_locations.union([piece.loc])
-
-            if piece.site.strength > remaining:
-                direction = get_direction(gmap, piece.loc, candidate.loc)
-                return (Move(piece.loc, direction), new_path_locations)
+    for direction in CARDINALS:
+        neighbor = gmap.neighbor(target, direction)
+        if owner[neighbor] != myID and owner[neighbor] != 0:
+            enemy_strength += strength[neighbor]
 
-            unexplored.put((remaining - piece.site.strength, piece, new_path_locations))
-            visited.add(piece.loc)
+    # when we can't find enough strength we wait, but if it's an enemy maybe we
+    # should push through anyway
 
-    #if is_enemy:
-        # normally we would return, not having found enough strength, but if it's an
-        # enemy we push through anyway
-    #    pass
+    return enemy_strength + strength[target]
 
-    return (None, None) # we don't have enough strength so wait until we do
+# kept between turns, the frontier is updated from what changed since the last one
+# and the gatherer reuses its search arrays
+frontier = Frontier(myID)
+gatherer = Gatherer(myID)
 
 def moves_for(gmap):
 
@@ -256,18 +191,15 @@ def moves_for(gmap):
     else:
         (moves, used_locations) = assign_to_battle(gmap, first_battle, set())
 
-    cost_map = cost_to_enemy_map(gmap)
-
-    borders = filter(functools.partial(piece_is_border, gmap), all_pieces(gmap))
-    borders = sorted(borders, key=lambda p: cost_map[p.loc])
+    used = bytearray(gmap.width * gmap.height)
+    for location in used_locations:
+        used[gmap.index(location)] = 1
 
-    for border in borders:
-        (move, consumed) = find_move(gmap, border, used_locations)
-        if move:
-            moves.append(move)
-            used_locations |= consumed
+    cost_map = cost_to_enemy_map(gmap)
 
-    return moves
+    targets = frontier.update(gmap).sorted(key=lambda index: cost_map[index])
+    needed = [strength_needed(gmap, target) for target in targets]
+    return moves + gatherer.gather(gmap, targets, needed, used)
 
 while True:
     gameMap = getFrame()
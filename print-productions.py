@@ -1,15 +1,17 @@
-import logging
-
 from hlt import *
 from networking import *
 
+myID, gameMap = getInit()
+sendInit('prod-logger')
+
+# logging is only needed once the bot has a frame to log, so it isn't imported and
+# set up until after sendInit
+import logging
+
 logging.basicConfig(filename='whatever.log')
 log = logging.getLogger()
 log.setLevel(logging.DEBUG)
 
-myID, gameMap = getInit()
-sendInit('prod-logger')
-
 gameMap = getFrame()
 
 log.debug('Production Values')
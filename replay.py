@@ -0,0 +1,99 @@
+'''
+Plays a recorded game back into a bot as fast as it will go, to time its turns on
+positions from real games.
+
+Record a game by setting HALITE_RECORD when the bots run, then replay it into any bot:
+
+    HALITE_RECORD=game-{player}.gz ./runGame.sh
+    python3 replay.py game-1.gz damacy [--repeat 3]
+
+The bot is hosted in this process and handed each recorded frame in turn. Its moves
+don't change the frames it is shown, the recording plays out as it happened.
+'''
+
+import argparse
+import gzip
+import statistics
+import time
+import zlib
+
+import numpy
+
+from host import HostedBot
+
+
+class Recording:
+    'the lines a bot read during a game: its player tag, the map and every frame'
+
+    def __init__(self, path):
+        lines = []
+        with gzip.open(path, 'rb') as f:
+            try:
+                for line in f:
+                    lines.append(line.rstrip(b'\n'))
+            except (EOFError, zlib.error):
+                # the bot was killed before it could close the file, everything it
+                # flushed up to then is there
+                pass
+
+        self.player = int(lines[0])
+        self.width, self.height = map(int, lines[1].split())
+        size = self.width * self.height
+        self.production = numpy.array(lines[2].split()[:size], dtype=numpy.uint8).tobytes()
+        self.frames = [decode_frame(line, size) for line in lines[3:] if line]
+
+
+def decode_frame(line, size):
+    '(owner, strength) planes of a frame line, as bytes'
+    tokens = numpy.array(line.split(), dtype=numpy.int64)
+    runs = (tokens.size - size) // 2
+    counts, owners = tokens[:2 * runs:2], tokens[1:2 * runs:2]
+    owner = numpy.repeat(owners, counts).astype(numpy.uint8)
+    return owner.tobytes(), tokens[2 * runs:].astype(numpy.uint8).tobytes()
+
+
+def replay(directory, recording):
+    '''
+    plays recording into the bot in directory and returns how long each of its turns
+    took, in seconds, and the moves it made
+    '''
+    owner, strength = recording.frames[0]
+    bot = HostedBot(directory, recording.player, recording.width, recording.height,
+                    recording.production, owner, strength)
+
+    timings, moves = [], 0
+    for owner, strength in recording.frames[1:]:
+        start = time.perf_counter()
+        pairs = bot.frame(owner, strength)
+        timings.append(time.perf_counter() - start)
+        moves += sum(1 for index, direction in pairs if direction)
+    return timings, moves
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('recording', help='a file written with HALITE_RECORD set')
+    parser.add_argument('bot', help='the directory of the bot to play it into')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='play the game this many times, with a fresh bot each time')
+    args = parser.parse_args()
+
+    recording = Recording(args.recording)
+    print('{}x{} map, player {}, {} frames'.format(
+        recording.width, recording.height, recording.player, len(recording.frames) - 1))
+    print('{:>4} {:>9} {:>8} {:>8} {:>8}'.format('run', 'frames/s', 'p50 ms', 'p99 ms', 'moves'))
+
+    for run in range(1, args.repeat + 1):
+        timings, moves = replay(args.bot, recording)
+        print('{:>4} {:>9.1f} {:>8.3f} {:>8.3f} {:>8}'.format(
+            run, len(timings) / sum(timings), statistics.median(timings) * 1000,
+            percentile(timings, 0.99) * 1000, moves))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,3 @@
 #!/bin/bash
 
-./halite -d "40 40" "python3 damacy/MyBot.py" "python3 amoeba/MyBot.py"
+python3 halite.py -d "40 40" "python3 damacy/MyBot.py" "python3 amoeba/MyBot.py"
@@ -20,6 +20,8 @@ Maybe:
 Problems:
 - pieces spend a lot of time oscilating when attempting to get to the perim
   This could be an artifact of being on the boundary of the kd-tree?
+  (the kd-tree didn't know the map wraps around, distances to the perimeter now
+  come from a breadth-first search which does)
   Soln: maybe when deciding which way to move, and filtering out capped ones,
         you also filter out the direction which doesn't face the perim
 - Capping only checks internal pieces, pieces on the perimeter don't check for capping
@@ -29,8 +31,6 @@ Problems:
 
 from collections import namedtuple, defaultdict
 import random
-import kdtree
-import cProfile, pstats
 
 from hlt import *
 from networking import *
@@ -74,11 +74,7 @@ def adjacent_unowned_lowest_strength(gmap, location):
 
 def get_direction(gmap, first, second):
     'given two adjacent locations returns direction from first to second'
-    for direction in CARDINALS:
-        loc = gmap.one_over(first, direction)
-        if loc.x == second.x and loc.y == second.y:
-            return direction
-    assert False, 'second is not adjacent to first'
+    return gmap.direction(first, second)
 
 def is_perimeter(gmap, location):
     # if there are any adjacent nodes which are not mine, I'm perimeter
@@ -88,15 +84,11 @@ def is_perimeter(gmap, location):
     return False
 
 def all_pieces(gmap):
-    for y in range(gmap.height):
-        for x in range(gmap.width):
-            location = Location(x, y)
-            site = gmap.getSite(location)
-            yield Piece(location, site)
+    for location in gmap.locations:
+        yield Piece(location, gmap.getSite(location))
 
 def moves_for(gmap):
     moves = []
-    perimeter_tree = kdtree.create(dimensions=2)
     perimeter_nodes = []
     internal_nodes = []
 
@@ -107,9 +99,10 @@ def moves_for(gmap):
     p_perim = lambda piece: is_perimeter(gmap, piece.loc)
     perimeter_nodes, internal_nodes = group_by_pred(p_perim, my_pieces)
 
-    for piece in perimeter_nodes:
-        perimeter_tree.add((piece.loc.x, piece.loc.y))
-    perimeter_tree.rebalance()
+    # how far every cell is from the closest perimeter piece, this wraps around the
+    # edges of the map just like the pieces do
+    distance = distance_transform(
+        gmap, [gmap.index(piece.loc) for piece in perimeter_nodes])[0]
 
     # 2) move perimeter_nodes
 
@@ -136,9 +129,6 @@ def moves_for(gmap):
         overcap_map[location] += site.strength
 
     for (location, site) in highs:
-        closest_perim = perimeter_tree.search_nn((location.x, location.y))[0]
-        perim_loc = Location(closest_perim.data[0], closest_perim.data[1])
-
         def p_overcap(neighbor):
             # This still allows some amount of capping, the idea is that two squares
             # which are both at 255 won't move into each other, but if we don't allow
@@ -147,7 +137,7 @@ def moves_for(gmap):
             return site.strength + moved_strength <= 300
         allowed = filter(p_overcap, adjacent_sites(gmap, location))
 
-        distance_to = lambda neighbor: gmap.getDistance(perim_loc, neighbor.loc)
+        distance_to = lambda neighbor: distance[gmap.index(neighbor.loc)]
         closest_neighbor = min(allowed, key=distance_to, default=None)
 
         if not closest_neighbor:
@@ -166,6 +156,7 @@ while True:
     gameMap = getFrame()
 
     #if turn == 100:
+    #    import cProfile, pstats
     #    profile = cProfile.Profile()
 
     #if turn >= 100 and turn <= 199:
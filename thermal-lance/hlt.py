@@ -1,6 +1,8 @@
 import random
 import math
-import copy
+import heapq
+import time
+from array import array
 
 STILL = 0
 NORTH = 1
@@ -11,25 +13,35 @@ WEST = 4
 DIRECTIONS = [a for a in range(0, 5)]
 CARDINALS = [a for a in range(1, 5)]
 
+# returned by the direction lookups for cells which aren't next to each other
+NOT_ADJACENT = 255
+
 ATTACK = 0
 STOP_ATTACK = 1
 
 class Location:
+    '''
+    Locations are immutable, GameMap hands out one shared instance per cell. The key
+    packs (x, y) into one int so hashing and comparing never build tuples.
+    '''
+    __slots__ = ('x', 'y', '_key')
+
     def __init__(self, x=0, y=0):
         self.x = x
         self.y = y
-
-    def __key(self):
-        return (self.x, self.y)
+        self._key = (x << 16) | y
 
     def __eq__(self, obj):
-        return self.__key() == obj.__key()
+        return self._key == obj._key
+
+    def __lt__(self, obj):
+        return self._key < obj._key
 
     def __repr__(self):
         return "<Location {}, {}>".format(self.x, self.y)
 
     def __hash__(self):
-        return hash(self.__key())
+        return self._key
 
 
 class Site:
@@ -42,6 +54,45 @@ class Site:
         return "<Site o:{}, s:{}, p:{}>".format(self.owner, self.strength, self.production)
 
 
+class SiteView:
+    '''
+    A Site which reads from (and writes through to) one cell of a GameMap. It holds no
+    data of its own, so getSite can hand them out without the map keeping a Site per cell
+    '''
+    __slots__ = ('_map', '_index')
+
+    def __init__(self, gameMap, index):
+        self._map = gameMap
+        self._index = index
+
+    @property
+    def owner(self):
+        return self._map.owner[self._index]
+
+    @owner.setter
+    def owner(self, value):
+        self._map.owner[self._index] = value
+
+    @property
+    def strength(self):
+        return self._map.strength[self._index]
+
+    @strength.setter
+    def strength(self, value):
+        self._map.strength[self._index] = value
+
+    @property
+    def production(self):
+        return self._map.production[self._index]
+
+    @production.setter
+    def production(self, value):
+        self._map.production[self._index] = value
+
+    def __repr__(self):
+        return "<Site o:{}, s:{}, p:{}>".format(self.owner, self.strength, self.production)
+
+
 class Move:
     def __init__(self, loc=0, direction=0):
         self.loc = loc
@@ -59,17 +110,128 @@ class Move:
         return "<Move l:({}, {}) d:{}>".format(self.loc.x, self.loc.y, direction_strings[self.direction])
 
 
+_geometries = {}
+
+def _geometry(width, height):
+    '''
+    returns (locations, neighbors, neighborLocations, deltaDirections) for a map of this
+    size. locations holds the Location of every cell, neighbors[index*5 + direction] is
+    the index of the cell one over in that direction and neighborLocations[index*5 +
+    direction] is its Location. deltaDirections[(dy % height)*width + dx % width] is the
+    direction which moves by (dx, dy). Built once per size and shared by every map of
+    that size.
+    '''
+    key = (width, height)
+    if key not in _geometries:
+        locations = tuple(Location(x, y) for y in range(height) for x in range(width))
+        neighbors = []
+        for y in range(height):
+            north = ((y - 1) % height) * width
+            south = ((y + 1) % height) * width
+            row = y * width
+            for x in range(width):
+                neighbors.extend((row + x, north + x, row + (x + 1) % width,
+                                  south + x, row + (x - 1) % width))
+        neighbors = tuple(neighbors)
+        neighborLocations = tuple(locations[index] for index in neighbors)
+
+        # on maps one or two cells across several directions reach the same cell, the
+        # first of CARDINALS wins, like probing with one_over would. An empty map (the
+        # default GameMap) has no cells to move between.
+        deltaDirections = bytearray([NOT_ADJACENT]) * (width * height)
+        for direction, dx, dy in ((NORTH, 0, -1), (EAST, 1, 0), (SOUTH, 0, 1), (WEST, -1, 0),
+                                  (STILL, 0, 0)):
+            if not deltaDirections:
+                break
+            delta = (dy % height) * width + dx % width
+            if deltaDirections[delta] == NOT_ADJACENT:
+                deltaDirections[delta] = direction
+
+        _geometries[key] = (locations, neighbors, neighborLocations, bytes(deltaDirections))
+    return _geometries[key]
+
+
 class GameMap:
-    def __init__(self, width = 0, height = 0, numberOfPlayers = 0):
+    def __init__(self, width = 0, height = 0, numberOfPlayers = 0,
+                 owner = None, strength = None, production = None):
         self.width = width
         self.height = height
-        self.contents = []
 
-        for y in range(0, self.height):
-            row = []
-            for x in range(0, self.width):
-                row.append(Site(0, 0, 0))
-            self.contents.append(row)
+        # The board is kept as flat row-major planes, cell (x, y) lives at y*width + x.
+        # Hot loops should index these directly, getSite hands out views into them.
+        size = width * height
+        self.owner = array('B', bytes(size)) if owner is None else owner
+        self.strength = array('B', bytes(size)) if strength is None else strength
+        self.production = array('B', bytes(size)) if production is None else production
+
+        (self.locations, self.neighbors,
+         self._neighborLocations, self._deltaDirections) = _geometry(width, height)
+
+        # networking keeps one map for the whole game and calls update with every frame
+        self.frame = 0
+        self.changed = set()
+        self._firstStrength = None
+        self._static = None
+
+    @property
+    def static(self):
+        '''
+        the map's StaticFields, what follows from its productions alone. networking's
+        getInit fills them in before sendInit, anything it didn't get to is worked out
+        the first time it's asked for.
+        '''
+        if self._static is None:
+            self._static = StaticFields(self)
+        return self._static
+
+    def index(self, l):
+        'the flat index of a location into owner, strength and production'
+        return l.y * self.width + l.x
+
+    def location(self, index):
+        return self.locations[index]
+
+    def changes_since(self, frame):
+        '''
+        the cells which changed since this map was at frame, or None if that is further
+        back than the previous frame and whoever is asking should start over
+        '''
+        if frame == self.frame:
+            return set()
+        if frame == self.frame - 1:
+            return self.changed
+        return None
+
+    def neighbor(self, index, direction):
+        'the index of the cell one over from index in direction'
+        return self.neighbors[index * 5 + direction]
+
+    def update(self, owner, strength):
+        '''
+        overwrites the owners and strengths in place with the next frame's, afterwards
+        self.changed holds the index of every cell whose owner or strength changed. On
+        the first update every cell counts as changed.
+        '''
+        size = self.width * self.height
+        if self.frame == 0:
+            changed = set(range(size))
+            # kept for StaticFields, which may not be made until much later
+            self._firstStrength = bytes(strength)
+        else:
+            # most rows are untouched from one frame to the next, compare whole rows
+            # first and only look at the cells of the ones which differ
+            changed = set()
+            width = self.width
+            for old, new in ((self.owner, owner), (self.strength, strength)):
+                for start in range(0, size, width):
+                    end = start + width
+                    if old[start:end] != new[start:end]:
+                        changed.update(i for i in range(start, end) if old[i] != new[i])
+
+        self.owner[:] = owner
+        self.strength[:] = strength
+        self.changed = changed
+        self.frame += 1
 
     def inBounds(self, l):
         return l.x >= 0 and l.x < self.width and l.y >= 0 and l.y < self.height
@@ -99,44 +261,515 @@ class GameMap:
         return math.atan2(dy, dx)
 
     def one_over(self, loc, direction):
-        if direction == STILL:
-            # TODO: Is the copy important? Locations should be immutable...
-            return Location(loc.x, loc.y)
-        if direction == NORTH:
-            return Location(loc.x, (loc.y - 1) % self.height)
-        if direction == SOUTH:
-            return Location(loc.x, (loc.y + 1) % self.height)
-        if direction == EAST:
-            return Location((loc.x + 1) % self.width, loc.y)
-        if direction == WEST:
-            return Location((loc.x - 1) % self.width, loc.y)
-        assert False
+        return self._neighborLocations[(loc.y * self.width + loc.x) * 5 + direction]
 
     def getLocation(self, loc, direction):
-        l = copy.deepcopy(loc)
-        if direction != STILL:
-            if direction == NORTH:
-                if l.y == 0:
-                    l.y = self.height - 1
-                else:
-                    l.y -= 1
-            elif direction == EAST:
-                if l.x == self.width - 1:
-                    l.x = 0
-                else:
-                    l.x += 1
-            elif direction == SOUTH:
-                if l.y == self.height - 1:
-                    l.y = 0
-                else:
-                    l.y += 1
-            elif direction == WEST:
-                if l.x == 0:
-                    l.x = self.width - 1
-                else:
-                    l.x -= 1
-        return l
+        return self._neighborLocations[(loc.y * self.width + loc.x) * 5 + direction]
+
+    def direction(self, first, second):
+        'given two adjacent locations returns direction from first to second'
+        direction = self._deltaDirections[((second.y - first.y) % self.height) * self.width
+                                          + (second.x - first.x) % self.width]
+        assert direction != NOT_ADJACENT, 'second is not adjacent to first'
+        return direction
+
+    def direction_between(self, first, second):
+        'like direction but takes flat indices'
+        width = self.width
+        direction = self._deltaDirections[((second // width - first // width) % self.height)
+                                          * width + (second - first) % width]
+        assert direction != NOT_ADJACENT, 'second is not adjacent to first'
+        return direction
+
+    def directions_between(self, firsts, seconds):
+        '''
+        direction_between for many pairs at once, firsts[i] to seconds[i]. Returns bytes,
+        or a uint8 array when given NumPy arrays. Pairs which aren't adjacent come back as
+        NOT_ADJACENT rather than failing.
+        '''
+        width, height, table = self.width, self.height, self._deltaDirections
+        if hasattr(firsts, 'dtype'):
+            import numpy
+            firsts = firsts.astype(numpy.intp, copy=False)
+            seconds = seconds.astype(numpy.intp, copy=False)
+            deltas = ((seconds // width - firsts // width) % height) * width \
+                + (seconds - firsts) % width
+            return numpy.frombuffer(table, dtype=numpy.uint8)[deltas]
+        return bytes(table[((second // width - first // width) % height) * width
+                           + (second - first) % width]
+                     for first, second in zip(firsts, seconds))
 
     def getSite(self, l, direction = STILL):
-        l = self.one_over(l, direction)
-        return self.contents[l.y][l.x]
+        return SiteView(self, self.neighbors[(l.y * self.width + l.x) * 5 + direction])
+
+
+class StaticFields:
+    '''
+    Fields which only depend on the productions and the shape of a map, so never change
+    during a game. They're kept on the map (GameMap.static) and worked out once:
+    precompute does them all in the init window, or as many as fit before a deadline,
+    and any left over are worked out when first asked for. The neighbor tables are the
+    map's own neighbors, shared by every map of its size.
+
+    value[i] is production per strength of cell i on the map's first frame, what
+    capturing it returns for what it costs. Neutral cells keep that strength until
+    they're taken.
+    smoothed(radius)[i] is the mean production over the square of cells at most radius
+    away from i in x and y, wrapping around the edges. hotspots() is the clusters of
+    cells with production in the top hotspot_fraction, as tuples of indices joined where
+    they touch, the most productive cluster first. cluster()[i] is which of them i is in,
+    -1 for none.
+    '''
+
+    radii = (1, 2, 4, 8)
+    hotspot_fraction = 0.25
+
+    def __init__(self, gmap):
+        self.width, self.height = gmap.width, gmap.height
+        self.neighbors = gmap.neighbors
+        self.production = bytes(gmap.production)
+        # the strengths of the first frame whenever the fields are made, so they come
+        # out the same however late a bot first asks for them
+        self._strength = gmap._firstStrength if gmap.frame else bytes(gmap.strength)
+        self._value = None
+        self._smoothed = {}
+        self._hotspots = None
+        self._cluster = None
+
+    def precompute(self, deadline=None):
+        '''
+        works out every field in turn until they're done or time.perf_counter() passes
+        deadline, returns whether they're all done
+        '''
+        stages = [lambda: self.value]
+        stages.extend((lambda radius=radius: self.smoothed(radius)) for radius in self.radii)
+        stages.append(self.hotspots)
+        for stage in stages:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return False
+            stage()
+        return True
+
+    @property
+    def value(self):
+        if self._value is None:
+            self._value = [production / max(strength, 1) for production, strength
+                           in zip(self.production, self._strength)]
+        return self._value
+
+    def smoothed(self, radius):
+        if radius not in self._smoothed:
+            width, height = self.width, self.height
+            # sliding window sums along each row, then down each column of those
+            rows = []
+            for start in range(0, width * height, width):
+                row = self.production[start:start + width]
+                total = sum(row[x % width] for x in range(-radius, radius + 1))
+                for x in range(width):
+                    rows.append(total)
+                    total += row[(x + radius + 1) % width] - row[(x - radius) % width]
+
+            sums = [0] * (width * height)
+            for x in range(width):
+                column = rows[x::width]
+                total = sum(column[y % height] for y in range(-radius, radius + 1))
+                for y in range(height):
+                    sums[y * width + x] = total
+                    total += column[(y + radius + 1) % height] - column[(y - radius) % height]
+
+            area = (2 * radius + 1) ** 2
+            self._smoothed[radius] = [total / area for total in sums]
+        return self._smoothed[radius]
+
+    def hotspots(self):
+        if self._hotspots is None:
+            production, neighbors = self.production, self.neighbors
+            size = len(production)
+            ranked = sorted(production, reverse=True)
+            threshold = max(ranked[min(size - 1, int(size * self.hotspot_fraction))], 1)
+
+            cluster = array('l', [-1]) * size
+            clusters = []
+            for seed in range(size):
+                if production[seed] < threshold or cluster[seed] != -1:
+                    continue
+                cluster[seed] = len(clusters)
+                cells, stack = [], [seed]
+                while stack:
+                    index = stack.pop()
+                    cells.append(index)
+                    base = index * 5
+                    for neighbor in neighbors[base + 1:base + 5]:
+                        if production[neighbor] >= threshold and cluster[neighbor] == -1:
+                            cluster[neighbor] = len(clusters)
+                            stack.append(neighbor)
+                clusters.append(tuple(sorted(cells)))
+
+            # most productive first, renumbering cluster to match
+            order = sorted(range(len(clusters)),
+                           key=lambda c: -sum(production[i] for i in clusters[c]))
+            renumber = array('l', [0]) * len(clusters)
+            for rank, c in enumerate(order):
+                renumber[c] = rank
+            self._hotspots = [clusters[c] for c in order]
+            self._cluster = array('l', (-1 if c == -1 else renumber[c] for c in cluster))
+        return self._hotspots
+
+    def cluster(self):
+        self.hotspots()
+        return self._cluster
+
+
+def shortest_paths(gmap, sources, weights, blocked=None):
+    '''
+    multi-source Dijkstra over the map using a bucket queue (Dial's algorithm), which
+    works because the weights are small integers. Moving into cell i costs weights[i]
+    (eg. gmap.strength), sources cost nothing and cells where blocked[i] is true are
+    never entered.
+
+    returns (cost, parent), both indexed like the map's planes. cost[i] is the cheapest
+    path from any source to i, or math.inf if there isn't one. parent[i] is the cell the
+    path comes from, -1 for sources and unreached cells.
+    '''
+    size = gmap.width * gmap.height
+    neighbors = gmap.neighbors
+    cost = [math.inf] * size
+    parent = array('l', [-1]) * size
+
+    # every path being considered costs between current and current + max(weights), so
+    # this many buckets can be reused in a ring
+    span = max(weights, default=0) + 1
+    buckets = [[] for _ in range(span)]
+    for source in sources:
+        cost[source] = 0
+        buckets[0].append(source)
+    pending = len(buckets[0])
+
+    current = 0
+    while pending:
+        bucket = buckets[current % span]
+        while bucket:
+            index = bucket.pop()
+            pending -= 1
+            if cost[index] != current:
+                continue  # it was queued again with a lower cost
+            base = index * 5
+            for neighbor in (neighbors[base + 1], neighbors[base + 2],
+                             neighbors[base + 3], neighbors[base + 4]):
+                if blocked is not None and blocked[neighbor]:
+                    continue
+                new_cost = current + weights[neighbor]
+                if new_cost < cost[neighbor]:
+                    cost[neighbor] = new_cost
+                    parent[neighbor] = index
+                    buckets[new_cost % span].append(neighbor)
+                    pending += 1
+        current += 1
+
+    return cost, parent
+
+
+def distance_transform(gmap, sources):
+    '''
+    a breadth-first search out from every source at once, wrapping around the edges of
+    the map like the game does. Returns (distance, towards), indexed like the map's
+    planes: distance[i] is how many moves i is from the closest source and towards[i]
+    is the direction of the first of them, STILL for the sources themselves. Without
+    any sources every distance is math.inf.
+    '''
+    size = gmap.width * gmap.height
+    neighbors, deltaDirections, width, height = \
+        gmap.neighbors, gmap._deltaDirections, gmap.width, gmap.height
+    distance = [math.inf] * size
+    towards = bytearray(size)
+
+    horizon = []
+    for source in sources:
+        if distance[source] != 0:
+            distance[source] = 0
+            horizon.append(source)
+
+    steps = 0
+    while horizon:
+        steps += 1
+        next_horizon = []
+        for index in horizon:
+            base = index * 5
+            for neighbor in (neighbors[base + 1], neighbors[base + 2],
+                             neighbors[base + 3], neighbors[base + 4]):
+                if distance[neighbor] != math.inf:
+                    continue
+                distance[neighbor] = steps
+                towards[neighbor] = deltaDirections[
+                    ((index // width - neighbor // width) % height) * width
+                    + (index - neighbor) % width]
+                next_horizon.append(neighbor)
+        horizon = next_horizon
+
+    return distance, towards
+
+class EnemyCostField:
+    '''
+    The cheapest path (by strength) from any enemy cell to every cell, never passing
+    through player's own cells, as kept by shortest_paths. update keeps the costs from
+    the previous frame and only repairs the cells whose paths went through something
+    which changed, so the work follows how much the board changed rather than its size.
+    '''
+
+    # if more than this fraction of the board needs repairing start over instead
+    recompute_fraction = 0.25
+
+    def __init__(self, player):
+        self.player = player
+        self.cost = []
+        self.parent = array('l')
+        self._map = None
+        self._frame = None
+
+    def update(self, gmap):
+        'brings the field up to date with gmap and returns cost'
+        changed = None
+        if gmap is self._map:
+            changed = gmap.changes_since(self._frame)
+
+        # how much of the field changed is only known once _repair has left out the
+        # cells which don't matter, like all of our own growing every turn. It starts
+        # over itself if that is too much.
+        if changed is None:
+            self.recompute(gmap)
+        elif changed:
+            self._repair(gmap, changed)
+
+        self._map = gmap
+        self._frame = gmap.frame
+        return self.cost
+
+    def recompute(self, gmap):
+        player = self.player
+        owner = gmap.owner
+        enemies = [index for index, o in enumerate(owner) if o != player and o != 0]
+        blocked = [o == player for o in owner]
+        self.cost, self.parent = shortest_paths(gmap, enemies, gmap.strength, blocked)
+
+    def _repair(self, gmap, changed):
+        player, cost, parent = self.player, self.cost, self.parent
+        owner, strength, neighbors = gmap.owner, gmap.strength, gmap.neighbors
+        inf = math.inf
+
+        # Our own cells were never reached and enemy cells are free whatever their
+        # strength, so those changing strength doesn't matter. Anything else which
+        # changed may have a different cost now, and so may every cell whose cheapest
+        # path went through it. Forget all of those.
+        invalid = set()
+        for index in changed:
+            o = owner[index]
+            if o == player and cost[index] == inf:
+                continue
+            if o != player and o != 0 and cost[index] == 0 and parent[index] == -1:
+                continue
+            invalid.add(index)
+
+        stack = list(invalid)
+        while stack:
+            index = stack.pop()
+            base = index * 5
+            for neighbor in (neighbors[base + 1], neighbors[base + 2],
+                             neighbors[base + 3], neighbors[base + 4]):
+                if parent[neighbor] == index and neighbor not in invalid:
+                    invalid.add(neighbor)
+                    stack.append(neighbor)
+
+        if len(invalid) > self.recompute_fraction * len(cost):
+            self.recompute(gmap)
+            return
+
+        for index in invalid:
+            cost[index] = inf
+            parent[index] = -1
+
+        # Every remaining cost is still achievable. Give each forgotten cell the best
+        # cost its neighbors offer, then let Dijkstra carry any improvement outwards,
+        # into forgotten and remembered cells alike.
+        horizon = []
+        for index in invalid:
+            o = owner[index]
+            if o == player:
+                continue
+            if o != 0:
+                cost[index] = 0
+                horizon.append((0, index))
+                continue
+            base = index * 5
+            best, via = inf, -1
+            for neighbor in (neighbors[base + 1], neighbors[base + 2],
+                             neighbors[base + 3], neighbors[base + 4]):
+                if cost[neighbor] < best:
+                    best, via = cost[neighbor], neighbor
+            if via != -1:
+                cost[index] = best + strength[index]
+                parent[index] = via
+                horizon.append((cost[index], index))
+        heapq.heapify(horizon)
+
+        while horizon:
+            current, index = heapq.heappop(horizon)
+            if current != cost[index]:
+                continue
+            base = index * 5
+            for neighbor in (neighbors[base + 1], neighbors[base + 2],
+                             neighbors[base + 3], neighbors[base + 4]):
+                if owner[neighbor] == player:
+                    continue
+                new_cost = current + strength[neighbor]
+                if new_cost < cost[neighbor]:
+                    cost[neighbor] = new_cost
+                    parent[neighbor] = index
+                    heapq.heappush(horizon, (new_cost, neighbor))
+
+
+class Gatherer:
+    '''
+    Finds which of player's pieces to set rolling towards each of a list of targets.
+    Starting from a target it searches outwards through player's pieces, the path which
+    still needs the least strength first, until it finds a piece with more strength than
+    is still needed. That piece moves one step back along the path, and it and every
+    piece on the path are used up, later targets can't draw on them.
+
+    Paths are kept as parent pointers, and visited cells are stamped with the number of
+    the search rather than cleared for every target. Both arrays live as long as the
+    Gatherer, so keep one around between turns.
+    '''
+
+    def __init__(self, player):
+        self.player = player
+        self._visited = array('L')
+        self._parent = array('l')
+        self._keys = ()
+        self._epoch = 0
+
+    def gather(self, gmap, targets, needed, used=None):
+        '''
+        returns the moves for targets, handled in order, where needed[i] is the strength
+        it takes to capture targets[i]. Targets we can't gather enough strength for get no
+        move, we wait until we can. used is a bytearray marking the pieces which are
+        already busy, it's updated with the pieces these moves use up.
+        '''
+        size = gmap.width * gmap.height
+        if len(self._visited) != size:
+            self._visited = array('L', [0]) * size
+            self._parent = array('l', [-1]) * size
+            self._epoch = 0
+        # ties are broken by Location, as they were when the search queued Pieces
+        self._keys = tuple(location._key for location in gmap.locations)
+        if used is None:
+            used = bytearray(size)
+
+        moves = []
+        for target, remaining in zip(targets, needed):
+            mover, towards = self._search(gmap, target, remaining, used)
+            if mover == -1:
+                continue
+
+            moves.append(Move(gmap.locations[mover], gmap.direction_between(mover, towards)))
+            index, parent = mover, self._parent
+            while index != target:
+                used[index] = 1
+                index = parent[index]
+
+        return moves
+
+    def _search(self, gmap, target, remaining, used):
+        'returns (mover, the cell it should move to), or (-1, -1) if there is no mover'
+        player, owner, strength, neighbors = self.player, gmap.owner, gmap.strength, gmap.neighbors
+        visited, parent, keys = self._visited, self._parent, self._keys
+
+        self._epoch += 1
+        epoch = self._epoch
+        visited[target] = epoch
+
+        horizon = [(remaining, keys[target], target)]
+        while horizon:
+            remaining, _, candidate = heapq.heappop(horizon)
+            base = candidate * 5
+            for piece in (neighbors[base + 1], neighbors[base + 2],
+                          neighbors[base + 3], neighbors[base + 4]):
+                if owner[piece] != player or used[piece] or visited[piece] == epoch:
+                    continue
+                parent[piece] = candidate
+                if strength[piece] > remaining:
+                    return piece, candidate
+                visited[piece] = epoch
+                heapq.heappush(horizon, (remaining - strength[piece], keys[piece], piece))
+
+        return -1, -1
+
+
+class Frontier:
+    '''
+    The cells player doesn't own which are next to one they do, the cells they can
+    expand into. update keeps it in step with the map by only looking around the cells
+    whose owner changed since the last frame.
+    '''
+
+    def __init__(self, player):
+        self.player = player
+        self.cells = set()
+        self._owner = array('B')
+        self._map = None
+        self._frame = None
+
+    def update(self, gmap):
+        'brings the frontier up to date with gmap, returns self'
+        changed = None
+        if gmap is self._map:
+            changed = gmap.changes_since(self._frame)
+
+        owner = gmap.owner
+        if changed is None:
+            self._rebuild(gmap)
+        else:
+            neighbors, previous = gmap.neighbors, self._owner
+            for index in changed:
+                if owner[index] == previous[index]:
+                    continue
+                base = index * 5
+                for cell in neighbors[base:base + 5]:
+                    if self._is_frontier(gmap, cell):
+                        self.cells.add(cell)
+                    else:
+                        self.cells.discard(cell)
+
+        self._owner = array('B', owner)
+        self._map = gmap
+        self._frame = gmap.frame
+        return self
+
+    def sorted(self, key=None):
+        '''
+        the frontier's indices in row-major order, or sorted by key(index). Cells with the
+        same key keep their row-major order.
+        '''
+        cells = sorted(self.cells)
+        if key is not None:
+            cells.sort(key=key)
+        return cells
+
+    def _is_frontier(self, gmap, index):
+        player, owner, neighbors = self.player, gmap.owner, gmap.neighbors
+        if owner[index] == player:
+            return False
+        base = index * 5
+        return (owner[neighbors[base + 1]] == player or owner[neighbors[base + 2]] == player
+                or owner[neighbors[base + 3]] == player or owner[neighbors[base + 4]] == player)
+
+    def _rebuild(self, gmap):
+        player, owner, neighbors = self.player, gmap.owner, gmap.neighbors
+        cells = set()
+        for index, o in enumerate(owner):
+            if o != player:
+                continue
+            base = index * 5
+            for neighbor in neighbors[base + 1:base + 5]:
+                if owner[neighbor] != player:
+                    cells.add(neighbor)
+        self.cells = cells
@@ -1 +0,0 @@
-pip3 install kdtree -t ./
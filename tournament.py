@@ -0,0 +1,160 @@
+'''
+Plays bots against each other over a sweep of seeds and map sizes, on every core, and
+reports how often each one wins.
+
+    python3 tournament.py [amoeba damacy ...] [--gauntlet damacy] [--seeds 10] [--sizes 20,30,40]
+
+By default every bot directory plays every other (round robin). With --gauntlet one bot
+plays each of the others. Each pairing plays once from each seat on every seed and size.
+
+Results are cached in CACHE, keyed by a hash of each bot's source, the seats, the seed,
+the size, whether the bots were hosted or on pipes, and the engine's source, so after
+changing one bot only the games it plays in are run again.
+'''
+
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import halite
+import host
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BOTS = ('amoeba', 'damacy', 'katamari', 'lance', 'point-defense-drone', 'thermal-lance')
+CACHE = os.path.join(ROOT, '.tournament-cache.jsonl')
+
+
+def source_hash(*paths):
+    'a hash of the .py files at paths, each a file or a directory of them'
+    digest = hashlib.sha256()
+    for path in paths:
+        files = [path] if os.path.isfile(path) else sorted(
+            os.path.join(path, name) for name in os.listdir(path) if name.endswith('.py'))
+        for name in files:
+            with open(name, 'rb') as f:
+                digest.update(os.path.basename(name).encode() + b'\0' + f.read() + b'\0')
+    return digest.hexdigest()[:16]
+
+
+def play_game(bots, seed, size, pipes):
+    'the seats of bots in the order they finished'
+    directories = [os.path.join(ROOT, bot) for bot in bots]
+    if pipes:
+        commands = ['{} {}'.format(sys.executable, os.path.join(d, 'MyBot.py'))
+                    for d in directories]
+        game = halite.play(commands, size, size, seed)
+    else:
+        game = host.play(directories, size, size, seed)
+    return game.ranking()
+
+
+def wilson(wins, games, z=1.96):
+    'the 95% Wilson score interval of a win rate'
+    if not games:
+        return 0.0, 1.0
+    rate = wins / games
+    centre = rate + z * z / (2 * games)
+    spread = z * math.sqrt(rate * (1 - rate) / games + z * z / (4 * games * games))
+    scale = 1 + z * z / games
+    return (centre - spread) / scale, (centre + spread) / scale
+
+
+def schedule(bots, gauntlet, seeds, sizes):
+    '(seats, seed, size) of every game to play'
+    if gauntlet:
+        pairings = [(gauntlet, bot) for bot in bots if bot != gauntlet]
+    else:
+        pairings = list(itertools.combinations(bots, 2))
+    return [(seats, seed, size)
+            for a, b in pairings for seats in ((a, b), (b, a))
+            for seed in seeds for size in sizes]
+
+
+def load_cache(path):
+    results = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                entry = json.loads(line)
+                results[entry['key']] = entry['ranking']
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('bots', nargs='*', default=BOTS)
+    parser.add_argument('--gauntlet', help='play this bot against each of the others')
+    parser.add_argument('--seeds', type=int, default=10, help='play seeds 0 up to this')
+    parser.add_argument('--sizes', default='20,30,40')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--pipes', action='store_true',
+                        help='run bots as subprocesses under halite.py instead of hosting them')
+    parser.add_argument('--cache', default=CACHE, help='- to neither read nor write one')
+    args = parser.parse_args()
+
+    bots = list(args.bots)
+    if args.gauntlet and args.gauntlet not in bots:
+        bots.append(args.gauntlet)
+    sizes = [int(size) for size in args.sizes.split(',')]
+    games = schedule(bots, args.gauntlet, range(args.seeds), sizes)
+
+    engine = source_hash(os.path.join(ROOT, 'halite.py'), os.path.join(ROOT, 'host.py'))
+    hashes = {bot: source_hash(os.path.join(ROOT, bot)) for bot in bots}
+    # hosted bots have no time limit while piped ones are killed for going over it, so
+    # the same game can end differently either way
+    mode = 'pipes' if args.pipes else 'hosted'
+    key = lambda seats, seed, size: '{} {} {} {} {} {}'.format(
+        engine, mode, ' '.join(hashes[bot] for bot in seats), ' '.join(seats), seed, size)
+
+    cached = load_cache(args.cache) if args.cache != '-' else {}
+    todo = [game for game in games if key(*game) not in cached]
+    print('{} games, {} cached, playing {} on {} workers'.format(
+        len(games), len(games) - len(todo), len(todo), args.workers), file=sys.stderr)
+
+    results = dict(cached)
+    cache = open(args.cache, 'a') if args.cache != '-' else None
+    try:
+        with ProcessPoolExecutor(args.workers) as pool:
+            futures = [pool.submit(play_game, seats, seed, size, args.pipes)
+                       for seats, seed, size in todo]
+            for game, future in zip(todo, futures):
+                results[key(*game)] = ranking = future.result()
+                if cache:
+                    cache.write(json.dumps({'key': key(*game), 'ranking': ranking}) + '\n')
+                    cache.flush()
+    finally:
+        if cache:
+            cache.close()
+
+    wins = {bot: 0 for bot in bots}
+    played = {bot: 0 for bot in bots}
+    pairs = {}
+    for seats, seed, size in games:
+        winner = seats[results[key(seats, seed, size)][0] - 1]
+        wins[winner] += 1
+        for bot in seats:
+            played[bot] += 1
+        pair = tuple(sorted(seats))
+        pairs.setdefault(pair, {bot: 0 for bot in pair})[winner] += 1
+
+    print('{:>20} {:>6} {:>6} {:>7} {:>15}'.format('bot', 'games', 'wins', 'rate', '95% interval'))
+    for bot in sorted(bots, key=lambda bot: -wins[bot] / max(1, played[bot])):
+        low, high = wilson(wins[bot], played[bot])
+        print('{:>20} {:>6} {:>6} {:>7.3f} {:>7.3f}-{:.3f}'.format(
+            bot, played[bot], wins[bot], wins[bot] / max(1, played[bot]), low, high))
+
+    print()
+    for (a, b), tally in sorted(pairs.items()):
+        total = tally[a] + tally[b]
+        low, high = wilson(tally[a], total)
+        print('{:>20} beat {:<20} {:>4}/{:<4} {:.3f} ({:.3f}-{:.3f})'.format(
+            a, b, tally[a], total, tally[a] / total, low, high))
+
+
+if __name__ == '__main__':
+    main()